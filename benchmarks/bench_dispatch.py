@@ -0,0 +1,135 @@
+"""
+Fire signed slash commands at /dispatch backed by a simulated cluster and report
+acknowledgement latency, end-to-end latency and throughput.
+
+    python -m benchmarks.bench_dispatch --requests 1000 --users 20 --servers 10
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import io
+import itertools
+import time
+import tracemalloc
+from urllib.parse import urlencode
+from .common import LoopLagProbe, configure, format_ms, memory_rows, report
+from .fake_slurm import FakeSlurm, make_servers
+from .stub_slack import StubSlack
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--servers", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--command", default="/sq", help="Slash command to send")
+    parser.add_argument("--args", default="", help="Command arguments after the server")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean SSH round trip (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--slack-latency", type=float, default=0.05)
+    parser.add_argument("--slack-rate-limit", type=float, default=0.0, help="Share of posts answered with 429")
+    parser.add_argument("--timeout", type=float, default=120, help="Max seconds to wait for all responses")
+    parser.add_argument("--trace-memory", action="store_true", help="Track Python allocations (slows the run)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+def sign(secret: str, body: str) -> dict:
+    timestamp = str(int(time.time()))
+    signature = hmac.new(secret.encode(), f"v0:{timestamp}:{body}".encode(), hashlib.sha256).hexdigest()
+    return {
+        "content-type": "application/x-www-form-urlencoded",
+        "x-slack-request-timestamp": timestamp,
+        "x-slack-signature": f"v0={signature}",
+    }
+
+async def run(args):
+    import httpx
+    import main
+    from src import ssh_client
+    from src.config import get_settings
+    from src.dispatch_queue import BUSY_MESSAGE, dispatch_queue
+    from src.slack_client import slack_client
+
+    cluster = FakeSlurm(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, seed=args.seed)
+    slack = StubSlack(latency=args.slack_latency, rate_limit_rate=args.slack_rate_limit, seed=args.seed)
+    ssh_client.set_backend(cluster)
+    slack.install(slack_client)
+
+    servers = make_servers(args.servers)
+    for server in servers:
+        for _ in range(20):
+            cluster.submit(server)
+
+    secret = get_settings().SLACK_SIGNING_SECRET
+    acks, sent_at = [], {}
+    busy = 0
+    counter = itertools.count()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+
+    async def send():
+        nonlocal busy
+        while (i := next(counter)) < args.requests:
+            response_url = f"https://hooks.slack.invalid/commands/{i}"
+            body = urlencode({
+                "command": args.command,
+                "text": f"{servers[i % len(servers)]} {args.args}".strip(),
+                "response_url": response_url,
+                "user_id": f"U{i % args.users:04d}",
+                "channel_id": "CBENCH",
+            })
+            started = time.monotonic()
+            resp = await client.post("/dispatch", content=body, headers=sign(secret, body))
+            acks.append(time.monotonic() - started)
+            if BUSY_MESSAGE in resp.text:
+                busy += 1
+            else:
+                sent_at[response_url] = started
+
+    probe = LoopLagProbe()
+    if args.trace_memory:
+        tracemalloc.start()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        dispatch_queue.start()
+        probe.start()
+        started = time.monotonic()
+        await asyncio.gather(*(send() for _ in range(args.concurrency)))
+        acked = time.monotonic() - started
+
+        # Every accepted command ends with a post to its response_url
+        deadline = time.monotonic() + args.timeout
+        while time.monotonic() < deadline and not all(url in slack.responses for url in sent_at):
+            await asyncio.sleep(0.05)
+        finished = max(slack.responses.values(), default=started) - started
+
+        await probe.stop()
+        await dispatch_queue.stop()
+        await client.aclose()
+        await slack_client.close()
+
+    end_to_end = [slack.responses[url] - t for url, t in sent_at.items() if url in slack.responses]
+    ssh_calls = sum(cluster.calls.values())
+    stats = dispatch_queue.stats()
+    report(f"Dispatch: {args.requests} × {args.command} from {args.users} users on {args.servers} servers", [
+        ("Acknowledged", f"{len(acks)} in {acked:.1f}s ({len(acks) / acked:.0f} req/s)"),
+        ("Rejected as busy", str(busy)),
+        ("Acknowledgement latency", format_ms(acks)),
+        ("Completed", f"{len(end_to_end)}/{len(sent_at)} in {finished:.1f}s ({len(end_to_end) / max(finished, 1e-9):.1f}/s)"),
+        ("End-to-end latency", format_ms(end_to_end)),
+        ("Queue wait (avg / max)", f"{stats['avg_wait'] * 1000:.1f} / {stats['max_wait'] * 1000:.1f} ms"),
+        ("Event loop lag", format_ms(probe.samples)),
+        ("SSH calls", f"{ssh_calls} ({ssh_calls / max(len(sent_at), 1):.2f} per command)"),
+        ("Slack posts", f"{sum(slack.posts.values())} ({slack.rate_limited} rate limited)"),
+        *memory_rows(),
+    ])
+
+def main():
+    args = parse_args()
+    configure(SSH_SERVERS=",".join(make_servers(args.servers)))
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
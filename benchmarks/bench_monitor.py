@@ -0,0 +1,121 @@
+"""
+Run the job monitor against a simulated cluster and report its cost.
+
+    python -m benchmarks.bench_monitor --jobs 500 --servers 10 --duration 60
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+import tracemalloc
+from .common import LoopLagProbe, configure, format_ms, memory_rows, report
+from .fake_slurm import FakeSlurm, make_servers
+from .stub_slack import StubSlack
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--servers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run the monitor")
+    parser.add_argument("--poll-interval", type=int, default=10, help="MONITOR_POLL_INTERVAL")
+    parser.add_argument("--latency", type=float, default=0.1, help="Mean SSH round trip (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of Slurm errors")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="Share of dropped connections")
+    parser.add_argument("--log-rate", type=float, default=2.0, help="Log lines per second per running job")
+    parser.add_argument("--slack-latency", type=float, default=0.05)
+    parser.add_argument("--trace-memory", action="store_true", help="Track Python allocations (slows the run)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+async def run(args):
+    from src import ssh_client
+    from src.monitor import monitor_service as monitor
+    from src.slack_client import slack_client
+
+    cluster = FakeSlurm(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        disconnect_rate=args.disconnect_rate,
+        log_rate=args.log_rate,
+        pending_time=(0, args.duration / 4),
+        run_time=(args.duration / 2, args.duration * 2),
+        seed=args.seed
+    )
+    slack = StubSlack(latency=args.slack_latency, seed=args.seed)
+    ssh_client.set_backend(cluster)
+    slack.install(slack_client)
+
+    # Time ticks and server polls without touching the monitor's code
+    ticks, polls = [], []
+    polled_jobs = 0
+    check_all_jobs, poll_server = monitor._check_all_jobs, monitor._poll_server
+
+    def timed_tick():
+        started = time.perf_counter()
+        try:
+            check_all_jobs()
+        finally:
+            ticks.append(time.perf_counter() - started)
+
+    async def timed_poll(server, job_ids):
+        nonlocal polled_jobs
+        started = time.perf_counter()
+        try:
+            return await poll_server(server, job_ids)
+        finally:
+            polls.append(time.perf_counter() - started)
+            polled_jobs += len(job_ids)
+
+    monitor._check_all_jobs = timed_tick
+    monitor._poll_server = timed_poll
+
+    servers = make_servers(args.servers)
+    probe = LoopLagProbe()
+    if args.trace_memory:
+        tracemalloc.start()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.jobs):
+            server = servers[i % len(servers)]
+            monitor.bind_job(server, cluster.submit(server))
+
+        started = time.perf_counter()
+        probe.start()
+        monitor.start()
+        await asyncio.sleep(args.duration)
+        await monitor.stop()
+        await probe.stop()
+        elapsed = time.perf_counter() - started
+        remaining = monitor.job_count
+        await slack_client.close()
+
+    ssh_calls = sum(cluster.calls.values())
+    report(f"Monitor: {args.jobs} jobs on {args.servers} servers for {elapsed:.0f}s", [
+        ("Job status checks", f"{polled_jobs} ({polled_jobs / elapsed:.1f}/s)"),
+        ("Server polls", f"{len(polls)} ({len(polls) / elapsed:.1f}/s)"),
+        ("Tick latency", format_ms(ticks)),
+        ("Server poll duration", format_ms(polls)),
+        ("Event loop lag", format_ms(probe.samples)),
+        ("SSH calls", f"{ssh_calls} ({ssh_calls / elapsed:.1f}/s)"),
+        *((f"  {kind}", str(count)) for kind, count in cluster.calls.most_common()),
+        ("Slack messages", str(slack.posts["message"])),
+        ("Jobs still bound", str(remaining)),
+        *memory_rows(),
+    ])
+
+def main():
+    args = parse_args()
+    configure(
+        MONITOR_POLL_INTERVAL=args.poll_interval,
+        MONITOR_MIN_INTERVAL=max(1, args.poll_interval // 2),
+        MONITOR_BATCH_WINDOW=max(1, args.poll_interval // 3),
+        SLACK_COALESCE_WINDOW=0.2,
+        SSH_SERVERS=",".join(make_servers(args.servers))
+    )
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
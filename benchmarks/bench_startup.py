@@ -0,0 +1,75 @@
+"""
+Measure cold start: how long `import main` takes in a fresh interpreter, and how
+long a fresh uvicorn process takes to answer its first request.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from .common import configure, format_ms, report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30, help="Max seconds to wait for the server to answer")
+    return parser.parse_args()
+
+def time_import() -> float:
+    """Import time of `main` as measured inside a fresh interpreter, excluding interpreter startup."""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=os.environ, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_first_request(timeout: float) -> float:
+    """Seconds from spawning uvicorn until GET /health answers 200."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No answer from {url} after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    args = parse_args()
+    configure()
+    imports = [time_import() for _ in range(args.runs)]
+    first_requests = [time_first_request(args.timeout) for _ in range(args.runs)]
+    report(f"Cold start over {args.runs} runs", [
+        ("import main (median)", f"{statistics.median(imports) * 1000:.1f}ms"),
+        ("import main", format_ms(imports)),
+        ("spawn to first request (median)", f"{statistics.median(first_requests) * 1000:.1f}ms"),
+        ("spawn to first request", format_ms(first_requests)),
+    ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure per-request CPU of /dispatch: signature check and form parsing alone, and the
+whole endpoint driven straight through the ASGI app (no HTTP client in the loop).
+
+    python -m benchmarks.bench_verify --requests 20000 --command /lsbind
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from urllib.parse import urlencode
+from .bench_dispatch import sign
+from .common import configure, format_ms, report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--command", default="/lsbind", help="Slash command to send; local ones keep SSH out of the numbers")
+    parser.add_argument("--text", default="", help="Command text")
+    return parser.parse_args()
+
+def make_request(i: int, command: str, text: str, secret: str):
+    body = urlencode({
+        "token": "unused",
+        "team_id": "T0BENCH",
+        "channel_id": "CBENCH",
+        "user_id": f"U{i % 50:04d}",
+        "command": command,
+        "text": text,
+        "response_url": f"https://hooks.slack.invalid/commands/{i}",
+        "trigger_id": f"{i}.bench",
+    }).encode()
+    headers = sign(secret, body.decode())
+    return body, [(name.encode(), value.encode()) for name, value in headers.items()]
+
+def asgi_scope(headers) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/dispatch", "raw_path": b"/dispatch", "query_string": b"",
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+async def call_app(app, body: bytes, headers) -> int:
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(asgi_scope(headers), receive, send)
+    return status
+
+async def run(args):
+    from fastapi import Request
+    import main
+    from src.config import get_settings
+    from src.security import verify_slack_request
+
+    secret = get_settings().SLACK_SIGNING_SECRET
+    requests = [make_request(i, args.command, args.text, secret) for i in range(args.requests * 2)]
+    verify_batch, app_batch = requests[:args.requests], requests[args.requests:]
+
+    # Signature check and parsing only
+    cpu = time.process_time()
+    for body, headers in verify_batch:
+        request = Request(asgi_scope(headers), receive=lambda body=body: _body(body))
+        header_map = dict(request.headers)
+        await verify_slack_request(request, header_map["x-slack-signature"], header_map["x-slack-request-timestamp"])
+    verify_cpu = (time.process_time() - cpu) / args.requests
+
+    # Whole endpoint
+    latencies, statuses = [], {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        cpu = time.process_time()
+        for body, headers in app_batch:
+            started = time.perf_counter()
+            status = await call_app(main.app, body, headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+        app_cpu = (time.process_time() - cpu) / args.requests
+
+        # A replayed request must be refused
+        replay_status = await call_app(main.app, *app_batch[0])
+
+    report(f"/dispatch CPU: {args.requests} × {args.command}", [
+        ("Verify + parse CPU per request", f"{verify_cpu * 1e6:.1f}µs"),
+        ("Endpoint CPU per request", f"{app_cpu * 1e6:.1f}µs ({1 / app_cpu:.0f} req/s per core)"),
+        ("Endpoint latency", format_ms(latencies)),
+        ("Responses", ", ".join(f"{status}×{count}" for status, count in sorted(statuses.items()))),
+        ("Replayed request", f"HTTP {replay_status}"),
+    ])
+
+async def _body(body: bytes) -> dict:
+    return {"type": "http.request", "body": body, "more_body": False}
+
+def main():
+    args = parse_args()
+    configure()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Sequence, Tuple
+
+# Settings the bot refuses to start without; real values are never needed offline
+_REQUIRED_ENV = {
+    "SLACK_SIGNING_SECRET": "benchmark-secret",
+    "SLACK_BOT_TOKEN": "xoxb-benchmark",
+    "SLACK_LOG_CHANNEL_ID": "CBENCH",
+    "SSH_HOST": "cluster.invalid",
+    "SSH_USER": "bench",
+    "TUNNEL_TOKEN": "unused",
+    "SLURM_CMD_SQUEUE": "squeue",
+    "SLURM_CMD_FULL_SQUEUE": "squeue --me",
+    "SLURM_CMD_SSHARE": "sshare",
+}
+
+def configure(**overrides):
+    """
+    Set the environment for `get_settings()`. Must run before anything from `src` is imported.
+    Bound jobs, the monitor lease and metric history go to a throwaway directory.
+    """
+    for key, value in _REQUIRED_ENV.items():
+        os.environ[key] = value
+    scratch = tempfile.mkdtemp(prefix="shiba-bench-")
+    os.environ["JOB_STORE_PATH"] = os.path.join(scratch, "jobs.db")
+    os.environ["LEASE_DB_PATH"] = os.path.join(scratch, "leases.db")
+    os.environ["METRIC_HISTORY_DIR"] = os.path.join(scratch, "history")
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+
+def percentiles(samples: Sequence[float], points: Sequence[int] = (50, 90, 99)) -> Dict[str, float]:
+    if not samples:
+        return {f"p{p}": 0.0 for p in points} | {"max": 0.0}
+    ordered = sorted(samples)
+    result = {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+    result["max"] = ordered[-1]
+    return result
+
+def format_ms(samples: Sequence[float]) -> str:
+    return "  ".join(f"{name}={value * 1000:.1f}ms" for name, value in percentiles(samples).items())
+
+class LoopLagProbe:
+    """Measures how late the event loop wakes up a task that sleeps `interval` seconds."""
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+def memory_rows() -> List[Tuple[str, str]]:
+    rows = []
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        rows.append(("Python heap (current / peak)", f"{current / 2**20:.1f} / {peak / 2**20:.1f} MiB"))
+    # ru_maxrss is in KiB on Linux
+    rows.append(("Peak RSS", f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB"))
+    return rows
+
+def report(title: str, rows: List[Tuple[str, str]]):
+    width = max(len(name) for name, _ in rows)
+    print(f"\n📊 {title}")
+    for name, value in rows:
+        print(f"  {name:<{width}}  {value}")
@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from src.log_tail import JOB_MARKER, TAIL_MARKER
+
+_JOBS_ARG = re.compile(r"--jobs=([\d,]+)")
+_FORMAT_ARG = re.compile(r'--format="?([^"\s]+)"?')
+_SCONTROL = re.compile(r"scontrol show job (\d+)")
+_SHOW = re.compile(r"^show (\d+)")
+_TAIL_PATH = re.compile(r'f="([^"]+)"')
+_TAIL_OFFSET = re.compile(r"\boff=(\d+);")
+_TAIL_INODE = re.compile(r'\[ "\$1" != "([^"]*)" \]')
+_TAIL_MAX = re.compile(r'-gt (\d+) \]')
+_BATCH_PART = re.compile(r'printf "\\n' + JOB_MARKER + r' %s\\n" (\d+); \( (.*?) \) 2>&1(?=; printf|; true$)')
+_FIELDS = {"A": "job_id", "i": "job_id", "t": "state", "j": "name", "r": "reason"}
+
+MIN_JOB_AGE = 300  # Seconds finished jobs stay visible to `squeue --states=all`
+
+@dataclass
+class FakeJob:
+    job_id: str
+    start_at: float  # Monotonic time the job leaves PD
+    end_at: float  # Monotonic time the job leaves the queue
+    experiment: str
+    inode: str
+    log: bytearray = field(default_factory=bytearray)
+    lines_written: int = 0
+
+    def state(self, now: float, include_finished: bool = False) -> Optional[str]:
+        if now < self.start_at:
+            return "PD"
+        if now < self.end_at:
+            return "R"
+        if include_finished and now < self.end_at + MIN_JOB_AGE:
+            return "CD"
+        return None
+
+    def field(self, name: str, state: str) -> str:
+        if name == "state":
+            return state
+        if name == "reason":
+            return "Priority" if state == "PD" else "None"
+        if name == "name":
+            return f"train_{self.experiment}"
+        return self.job_id
+
+    @property
+    def log_path(self) -> str:
+        return f"/fake/logs/{self.job_id}.out"
+
+class FakeSlurm:
+    """
+    Simulated Slurm cluster behind `ssh_client.set_backend`.
+
+    Understands the commands the bot sends (squeue, sacct, scontrol, the log tail
+    command, `show`) and answers them after `latency` ± `jitter` seconds. Running
+    jobs write `log_rate` lines per second, every `epoch_every`-th one a metric
+    line. `failure_rate` makes Slurm return errors, `disconnect_rate` drops the
+    connection like a dead ControlMaster.
+    """
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        failure_rate: float = 0.0,
+        disconnect_rate: float = 0.0,
+        log_rate: float = 1.0,
+        epoch_every: int = 20,
+        pending_time: Tuple[float, float] = (0, 30),
+        run_time: Tuple[float, float] = (300, 900),
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.disconnect_rate = disconnect_rate
+        self.log_rate = log_rate
+        self.epoch_every = epoch_every
+        self.pending_time = pending_time
+        self.run_time = run_time
+        self.rng = random.Random(seed)
+        self.jobs: Dict[str, Dict[str, FakeJob]] = {}
+        self.calls: Counter = Counter()
+        self._ids = itertools.count(100000)
+
+    def submit(self, server: str) -> str:
+        now = time.monotonic()
+        job_id = str(next(self._ids))
+        start_at = now + self.rng.uniform(*self.pending_time)
+        self.jobs.setdefault(server, {})[job_id] = FakeJob(
+            job_id=job_id,
+            start_at=start_at,
+            end_at=start_at + self.rng.uniform(*self.run_time),
+            experiment=f"exp_{job_id}",
+            inode=str(self.rng.randrange(10**6, 10**7))
+        )
+        return job_id
+
+    async def __call__(self, server: str, cmd: str) -> Tuple[int, str, str]:
+        self.calls[_command_kind(cmd)] += 1
+        await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+
+        roll = self.rng.random()
+        if roll < self.disconnect_rate:
+            return 255, "", "Connection closed by remote host"
+        if roll < self.disconnect_rate + self.failure_rate:
+            return 1, "", "slurm_load_jobs error: Socket timed out on send/recv operation"
+
+        now = time.monotonic()
+        jobs = self.jobs.get(server, {})
+        if JOB_MARKER in cmd:
+            return self._batch(jobs, cmd, now)
+        return self._answer(jobs, cmd, now)
+
+    def _answer(self, jobs: Dict[str, FakeJob], cmd: str, now: float) -> Tuple[int, str, str]:
+        if TAIL_MARKER in cmd:
+            return self._tail(jobs, cmd, now)
+        if match := _SCONTROL.search(cmd):
+            job = jobs.get(match.group(1))
+            if job is None or job.state(now, include_finished=True) is None:
+                return 1, "", "slurm_load_jobs error: Invalid job id specified"
+            return 0, f"JobId={job.job_id} JobName=train\n   StdOut={job.log_path}\n", ""
+        if match := _SHOW.match(cmd):
+            job = jobs.get(match.group(1))
+            if job is None:
+                return 1, "", f"No log for {match.group(1)}"
+            self._grow(job, now)
+            return 0, "\n".join(job.log.decode().splitlines()[-20:]), ""
+        if "sacct" in cmd:
+            return self._sacct(jobs, cmd, now)
+        if "squeue" in cmd:
+            return self._squeue(jobs, cmd, now)
+        return 0, "ok\n", ""
+
+    def _batch(self, jobs: Dict[str, FakeJob], cmd: str, now: float) -> Tuple[int, str, str]:
+        """A script from `build_batch_command`: every job's command, each after its marker line."""
+        parts = []
+        for job_id, inner in _BATCH_PART.findall(cmd):
+            _, stdout, stderr = self._answer(jobs, inner, now)
+            parts.append(f"\n{JOB_MARKER} {job_id}\n{stdout}{stderr}")
+        return 0, "".join(parts), ""
+
+    def _squeue(self, jobs: Dict[str, FakeJob], cmd: str, now: float) -> Tuple[int, str, str]:
+        include_finished = "--states=all" in cmd
+        match = _JOBS_ARG.search(cmd)
+        if match:
+            selected = [jobs[job_id] for job_id in match.group(1).split(",") if job_id in jobs]
+            if not any(job.state(now, include_finished) for job in selected):
+                return 1, "", "slurm_load_jobs error: Invalid job id specified"
+        else:
+            selected = list(jobs.values())
+        rows = [(job, job.state(now, include_finished)) for job in selected]
+        rows = [(job, state) for job, state in rows if state]
+
+        match = _FORMAT_ARG.search(cmd)
+        if match:
+            spec = match.group(1)
+            fields = [_FIELDS.get(code, "job_id") for code in re.findall(r"%(\w)", spec)]
+            separator = "|" if "|" in spec else " "
+            lines = [separator.join(job.field(f, state) for f in fields) for job, state in rows]
+            return 0, "".join(line + "\n" for line in lines), ""
+
+        lines = [f"{job.job_id:>8} gpu {job.field('name', state)} user {state:>2} 1:00 1 node01" for job, state in rows]
+        header = "   JOBID PARTITION NAME USER ST TIME NODES NODELIST"
+        return 0, "\n".join([header, *lines]) + "\n", ""
+
+    def _sacct(self, jobs: Dict[str, FakeJob], cmd: str, now: float) -> Tuple[int, str, str]:
+        lines = []
+        for job_id in _JOBS_ARG.search(cmd).group(1).split(","):
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            state = {"PD": "PENDING", "R": "RUNNING"}.get(job.state(now), "COMPLETED")
+            elapsed = max(0, int(min(now, job.end_at) - job.start_at))
+            elapsed_str = f"{elapsed // 3600:02d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}"
+            lines.append(f"{job_id}|{state}|0:0|{elapsed_str}|")
+            if state != "PENDING":
+                lines.append(f"{job_id}.batch|{state}|0:0|{elapsed_str}|{len(job.log) // 1024 + 1024}K")
+        return 0, "".join(line + "\n" for line in lines), ""
+
+    def _tail(self, jobs: Dict[str, FakeJob], cmd: str, now: float) -> Tuple[int, str, str]:
+        path = _TAIL_PATH.search(cmd).group(1)
+        job = next((j for j in jobs.values() if j.log_path == path), None)
+        if job is None:
+            return 0, f"{TAIL_MARKER} missing\n", ""
+
+        self._grow(job, now)
+        offset = int(_TAIL_OFFSET.search(cmd).group(1))
+        inode = _TAIL_INODE.search(cmd).group(1)
+        max_bytes = int(_TAIL_MAX.search(cmd).group(1))
+        size = len(job.log)
+        if inode != job.inode or size < offset:
+            offset = 0
+        length = min(size - offset, max_bytes)
+        data = job.log[offset:offset + length].decode(errors="replace")
+        return 0, f"{TAIL_MARKER} {job.inode} {size} {offset} {length}\n{data}", ""
+
+    def _grow(self, job: FakeJob, now: float):
+        """Append the log lines the job has written since the last read."""
+        running_for = min(now, job.end_at) - job.start_at
+        due = int(running_for * self.log_rate) if running_for > 0 else 0
+        lines = []
+        for n in range(job.lines_written + 1, due + 1):
+            if n % self.epoch_every == 0:
+                epoch = n // self.epoch_every
+                lines.append(
+                    f"Epoch: {epoch} | Experiment: {job.experiment} | "
+                    f"Validation Accuracy: {min(0.99, 0.5 + 0.01 * epoch):.4f}\n"
+                )
+            else:
+                lines.append(f"step {n} | loss {1.0 / n:.5f} | lr 0.0001\n")
+        if lines:
+            job.log.extend("".join(lines).encode())
+            job.lines_written = due
+
+def _command_kind(cmd: str) -> str:
+    if JOB_MARKER in cmd:
+        return "scontrol batch" if "scontrol" in cmd else "log batch"
+    if TAIL_MARKER in cmd:
+        return "tail"
+    token = cmd.rsplit("&&", 1)[-1].split(maxsplit=1)
+    return token[0] if token else "unknown"
+
+def make_servers(count: int) -> List[str]:
+    return [f"node{i:02d}" for i in range(count)]
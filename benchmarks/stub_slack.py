@@ -0,0 +1,37 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict
+import httpx
+
+class StubSlack:
+    """
+    Stand-in for the Slack API, plugged into `SlackClient` through an httpx mock transport.
+    Answers after `latency` seconds and returns HTTP 429 for `rate_limit_rate` of the posts.
+    """
+    def __init__(self, latency: float = 0.05, rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+        self.posts: Counter = Counter()
+        self.rate_limited = 0
+        # Last response_url post per URL, for end-to-end latency of slash commands
+        self.responses: Dict[str, float] = {}
+
+    def install(self, client):
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.rate_limit_rate:
+            self.rate_limited += 1
+            return httpx.Response(429, headers={"Retry-After": "0.5"})
+
+        if request.url.path == "/api/chat.postMessage":
+            self.posts["message"] += 1
+            return httpx.Response(200, json={"ok": True})
+
+        self.posts["response"] += 1
+        self.responses[str(request.url)] = time.monotonic()
+        return httpx.Response(200, text="ok")
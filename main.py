@@ -1,36 +1,145 @@
-import httpx
+import time
+
+# Reference point for the startup timings reported on /metrics
+_STARTED = time.perf_counter()
+
+import inspect
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, BackgroundTasks, Request
-from src.security import verify_slack_signature
-from src.ssh_client import execute_remote_command
-from src.command import get_command_handler
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import FastAPI, Depends, Response
+from src.security import verify_slack_request
+from src.ssh_client import RemoteResult, connection_manager, run_cached_command, run_remote_command
+from src.command import get_command_handler, is_known_command
+from src.config import get_settings, settings
 from src.monitor import monitor_service
+from src.slack_client import slack_client
+from src.streaming import stream_to_response_url
+from src.fanout import FanOut
+from src.dispatch_queue import dispatch_queue, BUSY_MESSAGE
+from src import metrics
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Fail here rather than on the first request if the environment is incomplete
+    get_settings()
+    connection_manager.start()
+    dispatch_queue.start()
     monitor_service.start()
+    _record_startup("ready")
     yield
-    monitor_service.stop()
+    await monitor_service.stop()
+    await dispatch_queue.stop()
+    await connection_manager.stop()
+    await slack_client.close()
 
 app = FastAPI(lifespan=lifespan)
 
-def background_job_runner(server: str, final_cmd: str, response_url: str):
-    result_text = execute_remote_command(server, final_cmd)
-    payload = {"text": f"💻 Output ({server}):\n```{result_text}```"}
-    try:
-        httpx.post(response_url, json=payload)
-    except Exception as e:
-        print(f"Failed to send: {e}")
-
-@app.post("/dispatch", dependencies=[Depends(verify_slack_signature)])
-async def dispatch_command(
-    request: Request,
-    background_tasks: BackgroundTasks
+def _record_startup(phase: str):
+    seconds = time.perf_counter() - _STARTED
+    metrics.STARTUP_SECONDS.set(seconds, phase=phase)
+    print(f"⏱️ Startup phase '{phase}' reached after {seconds:.2f}s")
+
+class FirstRequestTimer:
+    """
+    Records the first_request startup phase. A plain ASGI wrapper rather than an
+    `@app.middleware("http")` function, which would add a task group to every request.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.seen = False
+
+    async def __call__(self, scope, receive, send):
+        if self.seen or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self.seen = True
+        await self.app(scope, receive, send)
+        _record_startup("first_request")
+
+app.add_middleware(FirstRequestTimer)
+
+# Gauges read at scrape time
+metrics.Gauge("shiba_monitor_jobs", "Jobs bound to the monitor.", callback=lambda: monitor_service.job_count)
+metrics.Gauge("shiba_monitor_leader", "1 if this worker holds the monitor lease and polls clusters.", callback=lambda: int(monitor_service.is_leader))
+metrics.Gauge("shiba_dispatch_queue_depth", "Remote commands waiting for a worker.", callback=lambda: dispatch_queue.depth)
+metrics.Gauge("shiba_dispatch_running", "Remote commands currently running.", callback=lambda: dispatch_queue.running)
+metrics.Gauge("shiba_slack_queue_depth", "Channel messages waiting to be posted.", callback=lambda: slack_client.queue_depth())
+
+async def background_job_runner(
+    server: str,
+    final_cmd: str,
+    response_url: str,
+    cache_ttl: float = 0,
+    stream: bool = False,
+    max_updates: int = 0,
+    format_output: Optional[Callable[[str, RemoteResult], str]] = None
 ):
-    form_data = await request.form()
+    if stream:
+        await stream_to_response_url(server, final_cmd, response_url, max_updates)
+        return
+
+    if cache_ttl > 0:
+        result = await run_cached_command(server, final_cmd, cache_ttl)
+    else:
+        result = await run_remote_command(server, final_cmd)
+    if format_output:
+        payload = {"text": format_output(server, result)}
+    else:
+        payload = {"text": f"💻 Output ({server}):\n```{result.text}```"}
+    await slack_client.post_response(response_url, payload)
+
+def enqueue_jobs(user_id: str, response_url: str, jobs: List[Tuple[str, str, dict]]) -> bool:
+    """
+    Queue `background_job_runner` for each (server, command, runner kwargs) in `jobs`.
+    All or nothing: returns False if the dispatch queue can't take them all.
+    """
+    return dispatch_queue.submit_many(user_id, [
+        (server, background_job_runner, (server, cmd, response_url), kwargs)
+        for server, cmd, kwargs in jobs
+    ])
+
+def fan_out_jobs(user_id: str, response_url: str, title: str, jobs: List[Tuple[str, str]]) -> bool:
+    """
+    Run each (server, command) in `jobs` concurrently and report them in one message
+    that is updated as servers finish. All or nothing, like `enqueue_jobs`.
+    """
+    fan_out = FanOut(title, [server for server, _ in jobs], response_url, settings.FANOUT_DEADLINE)
+    return dispatch_queue.submit_many(user_id, [
+        (server, fan_out.run, (server, cmd), {})
+        for server, cmd in jobs
+    ])
+
+@app.get("/health")
+async def health():
+    return {
+        server: {
+            "state": h.state.value,
+            "last_ok": h.last_ok,
+            "last_error": h.last_error,
+            "consecutive_failures": h.consecutive_failures
+        }
+        for server, h in connection_manager.list_health().items()
+    }
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.post("/dispatch")
+async def dispatch_command(form_data: Dict[str, str] = Depends(verify_slack_request)):
+    started = time.perf_counter()
     command_name = form_data.get("command", "").lower()
+    # Only known commands get their own label, to keep label sets bounded
+    label = command_name if is_known_command(command_name) else "unknown"
+    try:
+        return await _dispatch(form_data, command_name)
+    finally:
+        metrics.DISPATCH_REQUESTS.inc(command=label)
+        metrics.DISPATCH_REQUEST_SECONDS.observe(time.perf_counter() - started, command=label)
+
+async def _dispatch(form_data: Dict[str, str], command_name: str):
     user_input = form_data.get("text", "").strip().lower()
     response_url = form_data.get("response_url")
+    user_id = form_data.get("user_id", "")
 
     handler = get_command_handler(command_name)
     if not handler:
@@ -46,6 +155,9 @@ async def dispatch_command(
         parts = user_input.split(maxsplit=1)
         server = parts[0]
         command_args = parts[1] if len(parts) > 1 else ""
+        servers = settings.server_names
+        if servers and server not in servers:
+            return {"response_type": "ephemeral", "text": f"❌ Unknown server `{server}`. Configured: {', '.join(f'`{s}`' for s in servers)}"}
     else:
         # Commands that don't need a server argument (e.g., /lsbind)
         server = "local"
@@ -59,10 +171,12 @@ async def dispatch_command(
         channel_id = form_data.get("channel_id")
         result_text = handler.execute_local(server, command_args, {
             "channel_id": channel_id,
-            "background_tasks": background_tasks,
             "response_url": response_url,
-            "job_runner": background_job_runner
+            "enqueue": lambda jobs: enqueue_jobs(user_id, response_url, jobs),
+            "fan_out": lambda title, jobs: fan_out_jobs(user_id, response_url, title, jobs)
         })
+        if inspect.isawaitable(result_text):
+            result_text = await result_text
         return {
             "response_type": "in_channel",
             "text": result_text
@@ -70,9 +184,19 @@ async def dispatch_command(
 
     final_cmd = handler.build_shell_command(command_args)
 
-    background_tasks.add_task(background_job_runner, server, final_cmd, response_url)
-    
+    queued = enqueue_jobs(user_id, response_url, [
+        (server, final_cmd, {
+            "cache_ttl": handler.cache_ttl,
+            "stream": handler.streams_output,
+            "format_output": handler.format_output
+        })
+    ])
+    if not queued:
+        return {"response_type": "ephemeral", "text": BUSY_MESSAGE}
+
     return {
         "response_type": "ephemeral",
         "text": f"⏳ Processing `{command_name} {user_input}`..."
     }
+
+_record_startup("import")
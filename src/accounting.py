@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .config import settings
+from .ssh_client import run_remote_command
+
+_FIELDS = "JobID,State,ExitCode,Elapsed,MaxRSS"
+_RSS_UNITS = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+# States sacct reports once a job is over; anything else may still change
+FINAL_STATES = frozenset({
+    "COMPLETED", "FAILED", "CANCELLED", "TIMEOUT", "OUT_OF_MEMORY",
+    "NODE_FAIL", "BOOT_FAIL", "DEADLINE", "PREEMPTED",
+})
+
+class JobSummary(NamedTuple):
+    job_id: str
+    state: str
+    exit_code: str
+    elapsed: str
+    max_rss: int  # Bytes, highest over the job's steps
+
+def build_sacct_command(job_ids: Iterable[str]) -> str:
+    return f"{settings.SLURM_CMD_SACCT} --jobs={','.join(job_ids)} --noheader --parsable2 --format={_FIELDS}"
+
+def _parse_rss(value: str) -> int:
+    if not value:
+        return 0
+    unit = _RSS_UNITS.get(value[-1].upper())
+    try:
+        return int(float(value[:-1]) * unit) if unit else int(value)
+    except ValueError:
+        return 0
+
+def parse_sacct(output: str) -> Dict[str, JobSummary]:
+    """
+    Fold `sacct --parsable2` rows into one summary per job. State, exit code and
+    elapsed time come from the job's own row; MaxRSS is only reported on steps
+    (`123.batch`, `123.0`, ...), so the highest one is kept.
+    """
+    jobs: Dict[str, List[str]] = {}
+    rss: Dict[str, int] = {}
+    for line in output.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) != 5 or not fields[0]:
+            continue
+        job_id, _, step = fields[0].partition(".")
+        if step:
+            rss[job_id] = max(rss.get(job_id, 0), _parse_rss(fields[4]))
+        else:
+            # "CANCELLED by 1234" -> "CANCELLED"
+            jobs[job_id] = [fields[1].split()[0] if fields[1] else "", fields[2], fields[3]]
+
+    return {
+        job_id: JobSummary(job_id, state, exit_code, elapsed, rss.get(job_id, 0))
+        for job_id, (state, exit_code, elapsed) in jobs.items()
+    }
+
+def _format_bytes(size: float) -> str:
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} TiB"
+
+def describe(summary: JobSummary) -> str:
+    """Slack text for a finished job: outcome, then run time, memory and exit code."""
+    if summary.state == "COMPLETED":
+        headline = "✅ Job completed."
+    elif summary.state == "CANCELLED":
+        headline = "🛑 Job was cancelled."
+    elif summary.state == "PREEMPTED":
+        headline = "⚠️ Job was preempted."
+    elif summary.state == "OUT_OF_MEMORY":
+        headline = "💥 Job ran out of memory."
+    else:
+        headline = f"❌ Job ended with state `{summary.state}`."
+
+    details = [f"⏱️ Elapsed {summary.elapsed}"]
+    if summary.max_rss:
+        details.append(f"💾 MaxRSS {_format_bytes(summary.max_rss)}")
+    details.append(f"Exit code `{summary.exit_code}`")
+    return f"{headline}\n{' · '.join(details)}"
+
+class Accounting:
+    """
+    Final state of finished jobs from Slurm accounting.
+
+    Jobs are looked up in batches, one `sacct` call per server for any number of
+    jobs, and final results are kept in a small LRU cache since they never change.
+    """
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], JobSummary]" = OrderedDict()
+
+    def cached(self, server: str, job_id: str) -> Optional[JobSummary]:
+        summary = self._cache.get((server, job_id))
+        if summary:
+            self._cache.move_to_end((server, job_id))
+        return summary
+
+    async def summarize(self, server: str, job_ids: List[str]) -> Dict[str, JobSummary]:
+        """Summaries of the given jobs that accounting knows to be over; others are left out."""
+        result = {job_id: s for job_id in job_ids if (s := self.cached(server, job_id))}
+        missing = [job_id for job_id in job_ids if job_id not in result]
+        if not missing:
+            return result
+
+        remote = await run_remote_command(server, build_sacct_command(missing), kind="sacct")
+        if not remote.ok:
+            print(f"⚠️ sacct failed on {server}: {remote.text}")
+            return result
+
+        for job_id, summary in parse_sacct(remote.text).items():
+            # Accounting may briefly lag behind the queue; only final states are kept
+            if job_id in missing and summary.state in FINAL_STATES:
+                result[job_id] = summary
+                self._cache[(server, job_id)] = summary
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+
+accounting = Accounting()
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class ResultCache(Generic[T]):
+    """
+    Short-TTL cache for results of async producers, with single-flight coalescing.
+
+    Concurrent callers asking for the same key share one in-flight producer call,
+    and results stay servable from memory for `ttl` seconds afterwards.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, T]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get_or_run(
+        self,
+        key: Hashable,
+        producer: Callable[[], Awaitable[T]],
+        ttl: float,
+        cacheable: Callable[[T], bool] = lambda result: True
+    ) -> T:
+        """
+        Return the cached value for `key`, join its in-flight producer, or start one.
+        Only results accepted by `cacheable` are kept once the producer finishes.
+        """
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(producer())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t, ttl, cacheable))
+
+        # Shielded, so one caller being cancelled doesn't abort the shared call
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task, ttl: float, cacheable: Callable[[T], bool]):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or ttl <= 0:
+            return
+
+        result = task.result()
+        if cacheable(result):
+            self._entries[key] = (time.monotonic() + ttl, result)
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+
+        # Still over budget: drop the entries closest to expiry
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            for key, _ in sorted(self._entries.items(), key=lambda item: item[1][0])[:overflow]:
+                del self._entries[key]
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
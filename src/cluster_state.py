@@ -0,0 +1,164 @@
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple, Optional
+from .config import settings
+from .metrics import CLUSTER_EVENTS
+from .ssh_client import run_cached_command
+
+# Fields requested from squeue; the job name goes last since it may itself contain `|`.
+# %A is the base ID of an array job (the job ID otherwise), %i the task as in `123_4` or `123_[5-9]`.
+_FORMAT = "%A|%i|%t|%r|%j"
+
+# Configuring (CF) counts as pending: the job has nodes but hasn't started yet
+PENDING_STATES = frozenset({"PD", "CF", "RQ", "RH", "RF"})
+ACTIVE_STATES = frozenset({"PD", "CF", "R", "CG", "S", "ST", "RQ", "RH", "RF", "RS", "SI", "SO", "RD"})
+FAILED_STATES = frozenset({"F", "TO", "OOM", "NF", "BF", "DL"})
+# Revoked (RV): a federated job that runs on another cluster instead
+TERMINAL_STATES = frozenset({"CD", "CA", "PR", "SE", "RV"}) | FAILED_STATES
+
+class EventKind(str, Enum):
+    SUBMITTED = "submitted"  # New job, pending
+    APPEARED = "appeared"  # New job first seen past pending (started between two snapshots)
+    STARTED = "started"
+    REQUEUED = "requeued"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    PREEMPTED = "preempted"
+    DISAPPEARED = "disappeared"  # Left the queue without a final state being seen
+
+class QueuedJob(NamedTuple):
+    job_id: str
+    state: str
+    name: str
+    reason: str
+
+class JobEvent(NamedTuple):
+    kind: EventKind
+    server: str
+    job: QueuedJob  # Latest known view of the job
+
+Snapshot = Dict[str, QueuedJob]
+Subscriber = Callable[[JobEvent], None]
+
+def build_queue_command() -> str:
+    # --states=all keeps recently finished jobs (for MinJobAge) so their final state is seen
+    return f"{settings.SLURM_CMD_SQUEUE} --me --states=all --noheader --format=\"{_FORMAT}\""
+
+def _task_rank(task: QueuedJob) -> int:
+    if task.state in ("R", "CG"):
+        return 0
+    if task.state in ACTIVE_STATES:
+        return 1
+    if task.state in FAILED_STATES:
+        return 2
+    return 3 if task.state in ("CA", "PR") else 4
+
+def _combine(job_id: str, tasks: List[QueuedJob]) -> QueuedJob:
+    """
+    One view of an array job: running while any task runs, otherwise active while
+    any task is, otherwise its worst final state (failed, then cancelled or preempted).
+    """
+    return min(tasks, key=_task_rank)._replace(job_id=job_id)
+
+def parse_queue(output: str) -> Snapshot:
+    """
+    Parse `build_queue_command` output into one entry per job, keyed by its base ID;
+    the tasks of an array job are combined. Lines that don't follow the format are ignored.
+    """
+    tasks: Dict[str, List[QueuedJob]] = {}
+    for line in output.splitlines():
+        fields = line.strip().split("|", 4)
+        if len(fields) == 5 and fields[1]:
+            base_id, task_id, state, reason, name = (f.strip() for f in fields)
+            job_id = base_id or task_id.split("_", 1)[0]
+            tasks.setdefault(job_id, []).append(QueuedJob(task_id, state, name, reason))
+    return {job_id: _combine(job_id, job_tasks) for job_id, job_tasks in tasks.items()}
+
+def _final_event(state: str) -> Optional[EventKind]:
+    if state == "CD":
+        return EventKind.COMPLETED
+    if state == "CA":
+        return EventKind.CANCELLED
+    if state == "PR":
+        return EventKind.PREEMPTED
+    if state == "RV":
+        return EventKind.DISAPPEARED
+    if state in TERMINAL_STATES:
+        return EventKind.FAILED
+    return None
+
+def diff(server: str, old: Snapshot, new: Snapshot) -> List[JobEvent]:
+    """Events turning `old` into `new`, in one pass over each snapshot."""
+    events = []
+    for job_id, job in new.items():
+        before = old.get(job_id)
+        if before is None:
+            events.append(JobEvent(EventKind.SUBMITTED if job.state in PENDING_STATES else EventKind.APPEARED, server, job))
+            final = _final_event(job.state)
+        elif before.state == job.state:
+            continue
+        elif job.state in PENDING_STATES and before.state not in PENDING_STATES:
+            events.append(JobEvent(EventKind.REQUEUED, server, job))
+            continue
+        elif before.state in PENDING_STATES and job.state in ("R", "CG"):
+            events.append(JobEvent(EventKind.STARTED, server, job))
+            continue
+        else:
+            final = None if before.state in TERMINAL_STATES else _final_event(job.state)
+
+        if final:
+            events.append(JobEvent(final, server, job))
+
+    for job_id, before in old.items():
+        if job_id not in new and before.state not in TERMINAL_STATES:
+            events.append(JobEvent(EventKind.DISAPPEARED, server, before))
+    return events
+
+class ClusterState:
+    """
+    Latest view of the user's queue on every server, kept with one squeue call per refresh.
+
+    Each refresh is diffed against the previous snapshot of that server and the
+    resulting events are passed to every subscriber. The first snapshot of a server
+    is a baseline and produces no events.
+    """
+    def __init__(self):
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._errors: Dict[str, str] = {}
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, subscriber: Subscriber):
+        self._subscribers.append(subscriber)
+
+    def snapshot(self, server: str) -> Optional[Snapshot]:
+        return self._snapshots.get(server)
+
+    def last_error(self, server: str) -> str:
+        return self._errors.get(server, "")
+
+    async def refresh(self, server: str) -> Optional[Snapshot]:
+        """Fetch, diff and publish the queue of `server`. Returns None if it couldn't be read."""
+        result = await run_cached_command(server, build_queue_command(), settings.REMOTE_CACHE_TTL, kind="squeue")
+        if not result.ok:
+            self._errors[server] = result.text.strip()
+            return None
+
+        new = parse_queue(result.text.strip())
+        old = self._snapshots.get(server)
+        self._snapshots[server] = new
+        self._errors.pop(server, None)
+
+        if old is not None:
+            for event in diff(server, old, new):
+                CLUSTER_EVENTS.inc(kind=event.kind.value)
+                self._publish(event)
+        return new
+
+    def _publish(self, event: JobEvent):
+        for subscriber in self._subscribers:
+            try:
+                subscriber(event)
+            except Exception as e:
+                print(f"⚠️ Event subscriber failed on {event.kind.value} for {event.job.job_id}: {e}")
+
+cluster_state = ClusterState()
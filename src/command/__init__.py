@@ -1,31 +1,46 @@
-from typing import Dict
-from ..config import get_settings
+import importlib
+import threading
+from typing import Callable, Dict
+from ..config import settings
 from .base import BaseCommand
-from .simple import SimpleCommand
-from .show import ShowCommand
-from .bind_unbind import BindCommand, UnbindCommand
-from .list_bind import ListBindCommand
-from .scancel import SCancelCommand
-from .sync import SyncCommand
-from .run import RunCommand
-from .lsconfig import LsConfigCommand
 
-settings = get_settings()
+def _handler(module: str, class_name: str) -> Callable[[], BaseCommand]:
+    """Factory importing `class_name` from the command module only when it is first needed."""
+    return lambda: getattr(importlib.import_module(f".{module}", __name__), class_name)()
 
-_commands = [
-    SimpleCommand("/sq", settings.SLURM_CMD_FULL_SQUEUE),
-    SimpleCommand("/share", settings.SLURM_CMD_SSHARE),
-    ShowCommand(),
-    BindCommand(),
-    UnbindCommand(),
-    ListBindCommand(),
-    SCancelCommand(),
-    SyncCommand(),
-    RunCommand(),
-    LsConfigCommand(),
-]
+def _simple(name: str, setting: str) -> Callable[[], BaseCommand]:
+    def factory() -> BaseCommand:
+        from .simple import SimpleCommand
+        return SimpleCommand(name, getattr(settings, setting), cache_ttl=settings.REMOTE_CACHE_TTL)
+    return factory
 
-COMMAND_REGISTRY: Dict[str, BaseCommand] = {cmd.name: cmd for cmd in _commands}
+# Slash command -> factory; a handler is built on its first request and reused
+_FACTORIES: Dict[str, Callable[[], BaseCommand]] = {
+    "/sq": _simple("/sq", "SLURM_CMD_FULL_SQUEUE"),
+    "/share": _simple("/share", "SLURM_CMD_SSHARE"),
+    "/show": _handler("show", "ShowCommand"),
+    "/bind": _handler("bind_unbind", "BindCommand"),
+    "/unbind": _handler("bind_unbind", "UnbindCommand"),
+    "/lsbind": _handler("list_bind", "ListBindCommand"),
+    "/scancel": _handler("scancel", "SCancelCommand"),
+    "/sync": _handler("sync", "SyncCommand"),
+    "/run": _handler("run", "RunCommand"),
+    "/lsconfig": _handler("lsconfig", "LsConfigCommand"),
+    "/trend": _handler("trend", "TrendCommand"),
+    "/clusters": _handler("clusters", "ClustersCommand"),
+}
+
+_handlers: Dict[str, BaseCommand] = {}
+_lock = threading.Lock()
+
+def is_known_command(command_name: str) -> bool:
+    return command_name in _FACTORIES
 
 def get_command_handler(command_name: str) -> BaseCommand | None:
-    return COMMAND_REGISTRY.get(command_name)
+    handler = _handlers.get(command_name)
+    if handler is None and command_name in _FACTORIES:
+        with _lock:
+            handler = _handlers.get(command_name)
+            if handler is None:
+                handler = _handlers[command_name] = _FACTORIES[command_name]()
+    return handler
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from ..ssh_client import RemoteResult
 
 class BaseCommand(ABC):
     """
@@ -34,6 +35,29 @@ class BaseCommand(ABC):
         """
         pass
 
+    @property
+    def cache_ttl(self) -> float:
+        """
+        Seconds the remote output may be served from the shared result cache.
+        Only read-only commands should override this. Defaults to 0 (never cached).
+        """
+        return 0
+
+    @property
+    def streams_output(self) -> bool:
+        """
+        Whether output should be posted progressively while the command runs,
+        instead of once it has finished. Defaults to False.
+        """
+        return False
+
+    def format_output(self, server: str, result: RemoteResult) -> str:
+        """
+        Slack text for the result of a finished remote command (not used when streaming).
+        Defaults to the raw output (or error message) in a code block.
+        """
+        return f"💻 Output ({server}):\n```{result.text}```"
+
     @property
     def is_local(self) -> bool:
         """Whether the command should be executed locally on the bot server."""
@@ -43,5 +67,6 @@ class BaseCommand(ABC):
         """
         Execute the command locally.
         `context` may contain extra info like channel_id.
+        May be overridden as `async def` when the command needs to await remote calls.
         """
         raise NotImplementedError("This command does not support local execution.")
@@ -1,7 +1,6 @@
-import re
 from .base import BaseCommand
+from ..cluster_state import ACTIVE_STATES, cluster_state
 from ..monitor import monitor_service
-from ..ssh_client import execute_remote_command
 
 class BindCommand(BaseCommand):
     @property
@@ -24,31 +23,41 @@ class BindCommand(BaseCommand):
     def is_local(self) -> bool:
         return True
 
-    def execute_local(self, server: str, user_input: str, context: dict) -> str:
+    async def execute_local(self, server: str, user_input: str, context: dict) -> str:
         job_ids = user_input.split()
-        
-        if not job_ids:
-            # Auto-bind all running jobs
-            squeue_cmd = f"{monitor_service.settings.SLURM_CMD_SQUEUE} --me --noheader --format=%i"
-            output = execute_remote_command(server, squeue_cmd).strip()
-            
-            if "Connection Dead" in output:
-                return output
-                
-            if not output:
-                return f"ℹ️ No running jobs found on `{server}` to bind."
-                
-            job_ids = output.split()
+        auto_bind = not job_ids
+
+        if auto_bind:
+            # Bind every active job, and keep binding new ones as they are submitted
+            snapshot = await cluster_state.refresh(server)
+            if snapshot is None:
+                return cluster_state.last_error(server)
+
+            job_ids = [job.job_id for job in snapshot.values() if job.state in ACTIVE_STATES]
+            monitor_service.set_auto_bind(server, True)
+            if not job_ids:
+                return f"ℹ️ No active jobs found on `{server}`. New jobs you submit there will be bound automatically."
 
         # channel_id is now ignored, using SLACK_LOG_CHANNEL_ID from env
         
         added_jobs = []
+        already_bound = []
         for job_id in job_ids:
-            monitor_service.bind_job(server, job_id)
-            added_jobs.append(job_id)
+            if monitor_service.bind_job(server, job_id):
+                added_jobs.append(job_id)
+            else:
+                already_bound.append(job_id)
         
-        jobs_str = ", ".join([f"*{jid}*" for jid in added_jobs])
-        return f"✅ Started monitoring Jobs {jobs_str} on `{server}`.\nI will notify you in the configured log channel when new results arrive."
+        msg = []
+        if added_jobs:
+            jobs_str = ", ".join([f"*{jid}*" for jid in added_jobs])
+            msg.append(f"✅ Started monitoring Jobs {jobs_str} on `{server}`.\nI will notify you in the configured log channel when new results arrive.")
+        if already_bound:
+            ab_str = ", ".join([f"*{jid}*" for jid in already_bound])
+            msg.append(f"ℹ️ Jobs {ab_str} are already being monitored on `{server}`.")
+        if auto_bind:
+            msg.append(f"🔄 New jobs on `{server}` will be bound automatically until `/unbind {server}`.")
+        return "\n".join(msg)
 
 
 class UnbindCommand(BaseCommand):
@@ -76,10 +85,9 @@ class UnbindCommand(BaseCommand):
         job_ids = user_input.split()
         
         if not job_ids:
-            # Auto-unbind all monitored jobs for this server
-            jobs_map = monitor_service.list_jobs()
-            server_jobs = jobs_map.get(server, [])
-            job_ids = [str(j["job_id"]) for j in server_jobs]
+            # Auto-unbind all monitored jobs for this server, and stop binding new ones
+            monitor_service.set_auto_bind(server, False)
+            job_ids = [job.job_id for job in monitor_service.jobs_on(server)]
             
             if not job_ids:
                 return f"ℹ️ No jobs are currently being monitored on `{server}`."
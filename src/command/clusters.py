@@ -0,0 +1,49 @@
+import asyncio
+from typing import Optional
+from .base import BaseCommand
+from ..dashboard import cluster_dashboard
+from ..slack_client import slack_client
+
+# Slack wants an answer within 3 seconds; past this a first snapshot is posted when ready
+FIRST_SNAPSHOT_WAIT = 2.0
+
+class ClustersCommand(BaseCommand):
+    @property
+    def name(self) -> str:
+        return "/clusters"
+
+    @property
+    def requires_server(self) -> bool:
+        return False
+
+    @property
+    def is_local(self) -> bool:
+        return True
+
+    def validate(self, user_input: str) -> Optional[str]:
+        return None
+
+    def build_shell_command(self, user_input: str) -> str:
+        return ""  # Not used
+
+    async def execute_local(self, server: str, user_input: str, context: dict) -> str:
+        dashboard = cluster_dashboard
+        if not dashboard.servers:
+            return "❌ No servers configured in `SSH_SERVERS`."
+
+        refresh = dashboard.refresh_if_stale()
+        if dashboard.has_snapshot or refresh is None:
+            return dashboard.render()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(refresh), timeout=FIRST_SNAPSHOT_WAIT)
+            return dashboard.render()
+        except asyncio.TimeoutError:
+            pass
+
+        response_url = context.get("response_url")
+        if response_url:
+            refresh.add_done_callback(lambda _: asyncio.ensure_future(
+                slack_client.post_response(response_url, {"response_type": "in_channel", "text": dashboard.render()})
+            ))
+        return f"⏳ Collecting resources from {len(dashboard.servers)} servers; the table will follow here."
@@ -22,17 +22,23 @@ class ListBindCommand(BaseCommand):
 
     def execute_local(self, server: str, user_input: str, context: dict) -> str:
         jobs_map = monitor_service.list_jobs()
+        auto_bind = monitor_service.auto_bind_servers()
+        auto_bind_str = ", ".join(f"`{srv}`" for srv in auto_bind)
         
         if not jobs_map:
-            return "📭 No jobs are currently being monitored."
+            msg = "📭 No jobs are currently being monitored."
+            if auto_bind:
+                msg += f"\n🔄 New jobs are bound automatically on {auto_bind_str}."
+            return msg
             
         msg = "📊 *Currently Monitored Jobs:*\n"
         for srv, jobs in jobs_map.items():
             msg += f"\n🖥️ `{srv}`:\n"
             for job in jobs:
-                status = job.get("status", "Unknown")
-                last_epoch = job["last_epoch"]
-                epoch_str = f"(Last Epoch: {last_epoch})" if last_epoch != -1 else "(Waiting for first result)"
-                msg += f"  • Job *{job['job_id']}* [`{status}`] {epoch_str}\n"
-                
+                status = job.status or "Unknown"
+                epoch_str = f"(Last Epoch: {job.last_epoch})" if job.last_epoch != -1 else "(Waiting for first result)"
+                msg += f"  • Job *{job.job_id}* [`{status}`] {epoch_str}\n"
+
+        if auto_bind:
+            msg += f"\n🔄 New jobs are bound automatically on {auto_bind_str}."
         return msg
@@ -1,8 +1,7 @@
 from typing import Optional
 from .base import BaseCommand
-from ..config import get_settings
-
-settings = get_settings()
+from ..config import settings
+from ..dispatch_queue import BUSY_MESSAGE
 
 class LsConfigCommand(BaseCommand):
     @property
@@ -24,7 +23,7 @@ class LsConfigCommand(BaseCommand):
         return "" # Not used for local commands
 
     def execute_local(self, server: str, user_input: str, context: dict) -> str:
-        servers = [s.strip() for s in settings.SSH_SERVERS.split(",") if s.strip()]
+        servers = settings.server_names
         
         if not servers:
             return "❌ No SSH_SERVERS configured in `.env`."
@@ -36,13 +35,12 @@ class LsConfigCommand(BaseCommand):
         # Command construction
         remote_cmd = f"cd ~/scratch/{project_name} && python -m script.show_config"
 
-        background_tasks = context.get("background_tasks")
-        job_runner = context.get("job_runner")
-        response_url = context.get("response_url")
+        enqueue = context.get("enqueue")
 
-        if not background_tasks or not job_runner or not response_url:
+        if not enqueue or not context.get("response_url"):
             return "❌ Internal error: Missing background task context."
 
-        background_tasks.add_task(job_runner, target_server, remote_cmd, response_url)
+        if not enqueue([(target_server, remote_cmd, {})]):
+            return BUSY_MESSAGE
 
         return f"📜 Fetching configuration from `{target_server}` for project `{project_name}`..."
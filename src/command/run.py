@@ -1,8 +1,13 @@
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Tuple
 from .base import BaseCommand
-from ..config import get_settings
+from .clusters import FIRST_SNAPSHOT_WAIT
+from ..config import settings
+from ..dashboard import cluster_dashboard
+from ..dispatch_queue import BUSY_MESSAGE
+from ..placement import rank_servers
 
-settings = get_settings()
+AUTO_FLAG = "--auto"
 
 class RunCommand(BaseCommand):
     @property
@@ -18,20 +23,37 @@ class RunCommand(BaseCommand):
         return True
 
     def validate(self, user_input: str) -> Optional[str]:
-        # Basic validation can happen here or in execute_local
+        parts = user_input.split()
+        if AUTO_FLAG in parts:
+            counts = [p[2:] for p in parts if p.startswith("n=")]
+            if any(not c.isdigit() or int(c) < 1 for c in counts):
+                return f"❌ Invalid server count. Usage: `/run {AUTO_FLAG} n=<servers> [args...]`"
         return None
 
     def build_shell_command(self, user_input: str) -> str:
         return "" # Not used for local commands
 
-    def execute_local(self, server: str, user_input: str, context: dict) -> str:
+    async def execute_local(self, server: str, user_input: str, context: dict) -> str:
         parts = user_input.strip().split()
         
-        target_servers = [s.strip() for s in settings.SSH_SERVERS.split(",") if s.strip()]
+        target_servers = settings.server_names
 
         if not target_servers:
              return "❌ No servers configured in `SSH_SERVERS` and none provided."
 
+        placement_note = ""
+        if AUTO_FLAG in parts:
+            # With --auto, n= is the number of servers to submit to, not a script argument
+            counts = [int(p[2:]) for p in parts if p.startswith("n=")]
+            parts = [p for p in parts if p != AUTO_FLAG and not p.startswith("n=")]
+            # partition= is passed on to the script, so servers are scored on that partition
+            partitions = [p.split("=", 1)[1] for p in parts if p.startswith("partition=")]
+            target_servers, placement_note = await self._place(
+                target_servers, counts[-1] if counts else 1, partitions[-1] if partitions else None
+            )
+            if not target_servers:
+                return placement_note
+
         # Filter valid arguments (key=value)
         valid_args = []
         for arg in parts:
@@ -46,15 +68,44 @@ class RunCommand(BaseCommand):
         # Command construction
         remote_cmd = f"cd ~/scratch/{project_name} && python -m script.build_script {script_args}"
 
-        background_tasks = context.get("background_tasks")
-        job_runner = context.get("job_runner")
-        response_url = context.get("response_url")
+        enqueue = context.get("enqueue")
+        fan_out = context.get("fan_out")
 
-        if not background_tasks or not job_runner or not response_url:
+        if not enqueue or not fan_out or not context.get("response_url"):
             return "❌ Internal error: Missing background task context."
 
-        # Enqueue tasks for each server
-        for srv in target_servers:
-            background_tasks.add_task(job_runner, srv, remote_cmd, response_url)
+        # A single server streams its output; several run concurrently into one results table
+        if len(target_servers) == 1:
+            queued = enqueue([(target_servers[0], remote_cmd, {"stream": True})])
+        else:
+            queued = fan_out("🚀 *Run*", [(srv, remote_cmd) for srv in target_servers])
+        if not queued:
+            return BUSY_MESSAGE
+
+        msg = f"🚀 Launching on *{len(target_servers)}* servers: `{', '.join(target_servers)}`\n🔹 Command: `{remote_cmd}`"
+        if placement_note:
+            msg += f"\n{placement_note}"
+        return msg
+
+    async def _place(self, servers: List[str], count: int, partition: Optional[str]) -> Tuple[List[str], str]:
+        """
+        Pick the `count` best servers to submit to from the cluster dashboard snapshot,
+        judged on `partition` (the servers' default partition if None).
+        Returns the chosen servers and a note on the ranking (or why nothing was chosen).
+        """
+        dashboard = cluster_dashboard
+        refresh = dashboard.refresh_if_stale()
+        if not dashboard.has_snapshot and refresh is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(refresh), timeout=FIRST_SNAPSHOT_WAIT)
+            except asyncio.TimeoutError:
+                return [], "⏳ Collecting cluster resources for placement; try again in a few seconds (see `/clusters`)."
+
+        ranking = rank_servers(dashboard, servers, partition)
+        chosen = [score for score in ranking if score.partition is not None][:count]
+        if not chosen:
+            return [], "❌ No server could be scored for placement:\n" + "\n".join(f"• {s.describe()}" for s in ranking)
 
-        return f"🚀 Launching on *{len(target_servers)}* servers: `{', '.join(target_servers)}`\n🔹 Command: `{remote_cmd}`"
+        lines = [f"🎯 *Placement* ({len(chosen)} of {len(ranking)} servers, best first):"]
+        lines += [f"{'✅' if score in chosen else '⏭️'} {score.describe()}" for score in ranking]
+        return [score.server for score in chosen], "\n".join(lines)
@@ -1,5 +1,148 @@
 import re
+from collections import Counter
+from typing import List, NamedTuple, Optional, Tuple
 from .base import BaseCommand
+from ..config import settings
+from ..ssh_client import RemoteResult
+
+MAX_JOB_IDS = 1000  # Job IDs a selection may expand to (ranges, array tasks)
+SHOWN_JOB_IDS = 20  # Cancelled job IDs listed in the summary
+_MARKER = "__SHIBA_SCANCEL__"
+_USAGE = (
+    "❌ Invalid selection. Usage: `/scancel <server> <selector...>` with job IDs (`123 124`), "
+    "ranges (`120-140`), array tasks (`123_4`, `123_[1-10]`) and filters (`name=sweep_*`, `state=pd,r`)."
+)
+
+_JOB_ID = re.compile(r"^\d+$")
+_RANGE = re.compile(r"^(\d+)-(\d+)$")
+_ARRAY_TASK = re.compile(r"^\d+_\d+$")
+_ARRAY_SPEC = re.compile(r"^(\d+)_\[([\d,\-]+)\]$")
+_NAME = re.compile(r"^[\w.\-*?]+$")
+
+# Accepted state names (as typed, lowercased by Slack) -> squeue compact state
+_STATES = {
+    "pd": "PD", "pending": "PD",
+    "r": "R", "running": "R",
+    "s": "S", "suspended": "S",
+    "cg": "CG", "completing": "CG",
+    "cf": "CF", "configuring": "CF",
+    "rq": "RQ", "requeued": "RQ",
+}
+
+class Selection(NamedTuple):
+    job_ids: List[str]  # Job IDs and array tasks; a plain job ID also selects all its array tasks
+    names: List[str]  # Shell globs on the job name
+    states: List[str]
+
+def _expand_indexes(spec: str, limit: int) -> Optional[List[int]]:
+    """
+    Array index list as in `1,3,5-7` -> [1, 3, 5, 6, 7]; None if it has more than `limit`
+    indexes. Sizes are checked before expanding, so a huge range is rejected for free.
+    """
+    indexes = []
+    for part in spec.split(","):
+        low, _, high = part.partition("-")
+        if not low.isdigit() or (high and not high.isdigit()):
+            raise ValueError(part)
+        low, high = int(low), int(high or low)
+        if low > high:
+            raise ValueError(part)
+        if len(indexes) + high - low >= limit:
+            return None
+        indexes.extend(range(low, high + 1))
+    return indexes
+
+def parse_selection(user_input: str) -> Tuple[Optional[Selection], str]:
+    """Parse the selectors after the server into a Selection, or return an error message."""
+    job_ids, names, states = [], [], []
+    for token in user_input.split():
+        if _JOB_ID.match(token) or _ARRAY_TASK.match(token):
+            job_ids.append(token)
+        elif match := _RANGE.match(token):
+            low, high = int(match.group(1)), int(match.group(2))
+            if low > high:
+                return None, f"❌ Invalid range `{token}`."
+            if high - low >= MAX_JOB_IDS - len(job_ids):
+                return None, f"❌ Range `{token}` is too large (max {MAX_JOB_IDS} jobs)."
+            job_ids.extend(str(i) for i in range(low, high + 1))
+        elif match := _ARRAY_SPEC.match(token):
+            try:
+                indexes = _expand_indexes(match.group(2), MAX_JOB_IDS - len(job_ids))
+            except ValueError:
+                return None, f"❌ Invalid array tasks `{token}`."
+            if indexes is None:
+                return None, f"❌ Too many jobs selected (max {MAX_JOB_IDS})."
+            job_ids.extend(f"{match.group(1)}_{i}" for i in indexes)
+        elif token.startswith("name="):
+            for name in filter(None, token[5:].split(",")):
+                if not _NAME.match(name):
+                    return None, f"❌ Invalid name filter `{name}`. Use letters, digits, `_.-` and `*`/`?` wildcards."
+                names.append(name)
+        elif token.startswith("state="):
+            for state in filter(None, token[6:].split(",")):
+                if state not in _STATES:
+                    return None, f"❌ Unknown state `{state}`. Use one of: {', '.join(sorted(set(_STATES)))}."
+                states.append(_STATES[state])
+        else:
+            return None, _USAGE
+
+        if len(job_ids) > MAX_JOB_IDS:
+            return None, f"❌ Too many jobs selected (max {MAX_JOB_IDS})."
+
+    if not (job_ids or names or states):
+        return None, _USAGE
+    return Selection(job_ids, names, states), ""
+
+def build_cancel_command(selection: Selection) -> str:
+    """
+    One remote call: list our jobs (array tasks expanded), keep the ones matching
+    every given filter, print them, then cancel them all with a single scancel.
+    """
+    clauses = []
+    if selection.job_ids:
+        patterns = [p for job_id in selection.job_ids for p in ((job_id,) if "_" in job_id else (job_id, f"{job_id}_*"))]
+        clauses.append(f"case \"$id\" in {'|'.join(patterns)}) ;; *) continue ;; esac")
+    if selection.states:
+        clauses.append(f"case \"$st\" in {'|'.join(selection.states)}) ;; *) continue ;; esac")
+    if selection.names:
+        clauses.append(f"case \"$name\" in {'|'.join(selection.names)}) ;; *) continue ;; esac")
+
+    # Slack lowercases command text, so names are matched case-insensitively
+    return (
+        "shopt -s nocasematch; "
+        f"m=$({settings.SLURM_CMD_SQUEUE} --me -h -r -o \"%i|%t|%j\" | while IFS=\"|\" read -r id st name; do "
+        f"{''.join(c + '; ' for c in clauses)}echo \"$id|$st|$name\"; done); "
+        f"echo \"$m\"; echo {_MARKER}; "
+        "[ -n \"$m\" ] && scancel $(echo \"$m\" | cut -d\"|\" -f1) 2>&1; echo \"rc=$?\""
+    )
+
+def summarize_cancel(server: str, result: RemoteResult) -> str:
+    output = result.text
+    if not result.ok or _MARKER not in output:
+        return f"❌ Could not cancel jobs on `{server}`:\n```{output.strip()}```"
+
+    listing, _, cancelled = output.partition(_MARKER)
+    jobs = [line.split("|", 2) for line in listing.splitlines() if line.count("|") >= 2]
+    if not jobs:
+        return f"ℹ️ No jobs of yours on `{server}` match."
+
+    result_lines = [line for line in cancelled.strip().splitlines() if line.strip()]
+    failed = bool(result_lines) and result_lines[-1] != "rc=0"
+    messages = [line for line in result_lines if not line.startswith("rc=")]
+
+    states = Counter(state for _, state, _ in jobs)
+    names = Counter(name for _, _, name in jobs)
+    ids = [job_id for job_id, _, _ in jobs]
+
+    lines = [
+        f"🛑 Cancelled *{len(jobs)}* job{'s' if len(jobs) != 1 else ''} on `{server}` "
+        f"({', '.join(f'{count} {state}' for state, count in states.most_common())})."
+    ]
+    lines.append("🔹 " + ", ".join(ids[:SHOWN_JOB_IDS]) + (f" … and {len(ids) - SHOWN_JOB_IDS} more" if len(ids) > SHOWN_JOB_IDS else ""))
+    lines.append("🏷️ " + ", ".join(f"`{name}` ×{count}" if count > 1 else f"`{name}`" for name, count in names.most_common(5)))
+    if failed or messages:
+        lines.append("⚠️ scancel reported:\n```" + "\n".join(messages or result_lines) + "```")
+    return "\n".join(lines)
 
 class SCancelCommand(BaseCommand):
     @property
@@ -7,10 +150,12 @@ class SCancelCommand(BaseCommand):
         return "/scancel"
 
     def validate(self, user_input: str) -> str | None:
-        if not re.match(r"^\d+$", user_input.strip()):
-            return "❌ Invalid Job ID. Usage: `/scancel <server> <job_id>`"
-        return None
+        _, error = parse_selection(user_input)
+        return error or None
 
     def build_shell_command(self, user_input: str) -> str:
-        job_id = user_input.strip()
-        return f"scancel {job_id} && echo '✅ Job {job_id} cancelled.'"
+        selection, _ = parse_selection(user_input)
+        return build_cancel_command(selection)
+
+    def format_output(self, server: str, result: RemoteResult) -> str:
+        return summarize_cancel(server, result)
@@ -6,6 +6,10 @@ class ShowCommand(BaseCommand):
     def name(self) -> str:
         return "/show"
 
+    @property
+    def streams_output(self) -> bool:
+        return True
+
     def validate(self, user_input: str) -> str | None:
         pattern = r"^(\d+)(?:\s+(\d+))?$"
         if not re.match(pattern, user_input.strip()):
@@ -1,14 +1,19 @@
 from .base import BaseCommand
 
 class SimpleCommand(BaseCommand):
-    def __init__(self, slack_name: str, server_cmd: str):
+    def __init__(self, slack_name: str, server_cmd: str, cache_ttl: float = 0):
         self._name = slack_name
         self._cmd = server_cmd
+        self._cache_ttl = cache_ttl
 
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def cache_ttl(self) -> float:
+        return self._cache_ttl
+
     def validate(self, user_input: str) -> str | None:
         # Simple commands generally don't take extra complex arguments needed for validation,
         # or they just ignore extra arguments.
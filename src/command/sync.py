@@ -1,8 +1,7 @@
 from typing import List, Optional
 from .base import BaseCommand
-from ..config import get_settings
-
-settings = get_settings()
+from ..config import settings
+from ..dispatch_queue import BUSY_MESSAGE
 
 class SyncCommand(BaseCommand):
     @property
@@ -21,7 +20,7 @@ class SyncCommand(BaseCommand):
         # if not user_input.strip():
         #     return "❌ Please specify a project name. Usage: `/sync <project_name>`"
         
-        servers = [s.strip() for s in settings.SSH_SERVERS.split(",") if s.strip()]
+        servers = settings.server_names
         if not servers:
             return "❌ No SSH_SERVERS configured in `.env`. Please add a comma-separated list of servers."
         
@@ -32,22 +31,28 @@ class SyncCommand(BaseCommand):
 
     def execute_local(self, server: str, user_input: str, context: dict) -> str:
         project_name = user_input.strip() or settings.DEFAULT_PROJECT_NAME
-        servers = [s.strip() for s in settings.SSH_SERVERS.split(",") if s.strip()]
+        servers = settings.server_names
         
         if not servers:
             return "❌ No servers found in configuration."
 
-        background_tasks = context.get("background_tasks")
-        job_runner = context.get("job_runner")
-        response_url = context.get("response_url")
+        enqueue = context.get("enqueue")
+        fan_out = context.get("fan_out")
 
-        if not background_tasks or not job_runner or not response_url:
+        if not enqueue or not fan_out or not context.get("response_url"):
             return "❌ Internal error: Missing background task context."
 
-        # Enqueue tasks for each server
+        jobs = []
         for srv in servers:
             remote_cmd = f"cd ~/scratch/{project_name} && git -c core.sshCommand=\"ssh -i ~/.ssh/{srv}\" pull"
-            
-            background_tasks.add_task(job_runner, srv, remote_cmd, response_url)
+            jobs.append((srv, remote_cmd))
+
+        # A single server streams its output; several run concurrently into one results table
+        if len(jobs) == 1:
+            queued = enqueue([(jobs[0][0], jobs[0][1], {"stream": True})])
+        else:
+            queued = fan_out(f"🔄 *Sync `{project_name}`*", jobs)
+        if not queued:
+            return BUSY_MESSAGE
 
         return f"🔄 Initiated sync for project `{project_name}` on {len(servers)} servers: `{', '.join(servers)}`"
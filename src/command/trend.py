@@ -0,0 +1,70 @@
+import re
+from typing import Dict, Optional
+from .base import BaseCommand
+from ..timeseries import Series, TrendSummary, lower_is_better, metric_history, sparkline, summarize
+
+_USAGE = "❌ Invalid format. Usage: `/trend <server> <Job ID> [metric] [target=<value>]`"
+_ARGS = re.compile(r"^(\d+)(?:\s+(?!target=)(\S+))?(?:\s+target=([-+]?\d*\.?\d+(?:e[-+]?\d+)?))?$")
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} days"
+
+def _eta(metric: str, summary: TrendSummary, target: float) -> str:
+    lower = lower_is_better(metric)
+    if (summary.best <= target) if lower else (summary.best >= target):
+        return f"🎯 Target {target:g} reached at step {summary.best_step:g}."
+    if summary.slope == 0 or (summary.slope > 0) == lower:
+        return f"🎯 Target {target:g} not in sight at the current trend."
+
+    steps = (target - summary.last) / summary.slope
+    text = f"🎯 Target {target:g} in ~{steps:.0f} steps"
+    if summary.seconds_per_step:
+        text += f" (≈ {_format_duration(steps * summary.seconds_per_step)})"
+    return text + "."
+
+class TrendCommand(BaseCommand):
+    @property
+    def name(self) -> str:
+        return "/trend"
+
+    @property
+    def is_local(self) -> bool:
+        return True
+
+    def validate(self, user_input: str) -> str | None:
+        if not _ARGS.match(user_input.strip()):
+            return _USAGE
+        return None
+
+    def build_shell_command(self, user_input: str) -> str:
+        return ""  # Not used
+
+    def execute_local(self, server: str, user_input: str, context: dict) -> str:
+        job_id, metric_arg, target_arg = _ARGS.match(user_input.strip()).groups()
+        history: Dict[str, Series] = metric_history.load(server, job_id)
+        if not history:
+            return f"📭 No metric history for Job *{job_id}* on `{server}`. Results are recorded while a job is bound."
+
+        if metric_arg:
+            # Slack command text arrives lowercased
+            history = {name: series for name, series in history.items() if name.lower() == metric_arg.lower()}
+            if not history:
+                return f"❌ Job *{job_id}* has no metric `{metric_arg}`."
+
+        target: Optional[float] = float(target_arg) if target_arg else None
+        lines = [f"📈 *Trend for Job {job_id}* on `{server}`"]
+        for metric, series in history.items():
+            summary = summarize(metric, series)
+            lines.append(
+                f"\n*{metric}* `{sparkline(series.values)}`\n"
+                f"{summary.points} points, steps {summary.first_step:g}–{summary.last_step:g} · "
+                f"best *{summary.best:g}* (step {summary.best_step:g}) · last *{summary.last:g}* · "
+                f"slope {summary.slope:+.3g}/step"
+            )
+            if target is not None:
+                lines.append(_eta(metric, summary, target))
+        return "\n".join(lines)
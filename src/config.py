@@ -1,26 +1,101 @@
+import threading
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Any, Callable, Dict, Generic, List, TypeVar
+
+T = TypeVar("T")
 
 class Settings(BaseSettings):
     SLACK_SIGNING_SECRET: str
     SLACK_BOT_TOKEN: str
     SLACK_LOG_CHANNEL_ID: str
+    SLACK_COALESCE_WINDOW: float = 1.0  # Seconds to gather notifications into one message (0 disables)
     
     SSH_HOST: str
     SSH_USER: str
     SSH_SERVERS: str = ""  # Comma-separated list of servers
+    SSH_KEEPALIVE_INTERVAL: int = 30  # Seconds between ControlMaster health checks
+    SSH_DEAD_RETRY_INTERVAL: int = 60  # Seconds to fail fast on a dead server before retrying
 
     DEFAULT_PROJECT_NAME: str = "semantic_selector"
 
+    # Log patterns the monitor reports for every bound job.
+    # Each regex needs named groups `step` and `value`; `experiment` and `name` are optional.
+    METRIC_PATTERNS: List[Dict[str, str]] = [{
+        "name": "Accuracy",
+        "step_label": "Epoch",
+        "pattern": r"Epoch:\s+(?P<step>\d+)\s+\|\s+Experiment:\s+(?P<experiment>.+?)\s+\|\s+Validation Accuracy:\s+(?P<value>[\d\.]+)",
+    }]
+
     TUNNEL_TOKEN: str
 
     SLURM_CMD_SQUEUE: str
     SLURM_CMD_FULL_SQUEUE: str
     SLURM_CMD_SSHARE: str
+    SLURM_CMD_SACCT: str = "sacct"
+    SLURM_CMD_SINFO: str = "sinfo"
+
+    DISPATCH_QUEUE_DEPTH: int = 100  # Queued remote commands before answering "busy"
+    DISPATCH_WORKERS: int = 16  # Remote commands running at once
+    DISPATCH_PER_SERVER_LIMIT: int = 4  # Remote commands running at once against one server
+
+    STREAM_DEADLINE: float = 600  # Overall limit for streamed commands (/show, /sync, /run)
+    STREAM_READ_TIMEOUT: float = 120  # Max silence between two output chunks
+    STREAM_UPDATE_INTERVAL: float = 3.0  # Min seconds between progressive Slack updates
+    STREAM_MAX_UPDATES: int = 5  # Slack accepts 5 posts per response_url
+    FANOUT_DEADLINE: float = 300  # Shared limit for one command run on several servers (/run, /sync)
+
+    DASHBOARD_REFRESH_INTERVAL: float = 60  # Age at which /clusters refreshes its snapshot in the background
+    REMOTE_CACHE_TTL: float = 10.0  # Seconds read-only results (/sq, /share, monitor squeue) are reused
+
+    MONITOR_POLL_INTERVAL: int = 30  # Base seconds between polls of a job
+    MONITOR_MIN_INTERVAL: int = 15  # Poll interval right after a job changed state or logged new metrics
+    MONITOR_MAX_INTERVAL: int = 600  # Upper bound for long-pending jobs and unreachable servers
+    MONITOR_BATCH_WINDOW: int = 10  # Jobs due within this many seconds join a server poll early
+    MONITOR_SERVER_TIMEOUT: int = 15  # Deadline (seconds) for one full poll of a server
+    MONITOR_MAX_WORKERS: int = 8  # Servers polled concurrently
+    MONITOR_LOG_MAX_BYTES: int = 1048576  # Max new log bytes fetched per job per poll
+    JOB_STORE_PATH: str = "data/jobs.db"  # SQLite file holding bound jobs across restarts
+    LEASE_DB_PATH: str = "data/leases.db"  # SQLite file shared by workers for the monitor lease and seen request signatures
+    METRIC_HISTORY_DIR: str = "data/history"  # Metric points of monitored jobs, read by /trend
+    METRIC_HISTORY_MAX_POINTS: int = 4096  # Points per job and metric before older ones are downsampled
+    MONITOR_LEASE_TTL: int = 30  # Seconds before another worker takes over from an unresponsive monitor
+
+    @property
+    def server_names(self) -> List[str]:
+        return [s.strip() for s in self.SSH_SERVERS.split(",") if s.strip()]
 
     class Config:
         env_file = ".env"
 
 @lru_cache()
-def get_settings():
+def get_settings() -> Settings:
     return Settings()
+
+class Lazy(Generic[T]):
+    """
+    Stands in for the object built by `factory`, which runs on first attribute access.
+    Lets modules expose ready-to-use singletons without reading settings at import time.
+    """
+    __slots__ = ("_factory", "_instance", "_lock")
+
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _resolve(self) -> T:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._resolve(), name, value)
+
+# Validated once, on first use; import this rather than calling get_settings() at module level
+settings: Settings = Lazy(get_settings)
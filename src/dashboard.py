@@ -0,0 +1,218 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .config import Lazy, settings
+from .ssh_client import run_remote_command
+
+# Separate the sinfo, squeue and sshare output, all fetched in one SSH round trip
+_SQUEUE_MARKER = "__SHIBA_SQUEUE__"
+_SSHARE_MARKER = "__SHIBA_SSHARE__"
+# Fixed-width columns split on whitespace; none of these fields contain spaces
+_SINFO_FIELDS = "NodeList:64,Partition:32,StateCompact:16,Gres:128,GresUsed:128"
+# Nodes in these states can't take new work, so their free GPUs don't count as idle
+_UNAVAILABLE = ("down", "drain", "drng", "fail", "maint", "boot", "powered_down", "powering_down", "npc", "unk", "inval", "resv")
+# State suffixes for not responding, powered off and reserved for maintenance
+_UNAVAILABLE_FLAGS = frozenset("*~$")
+_STATE_FLAGS = "*~#!%$@^-"
+
+def _node_available(state: str) -> bool:
+    base = state.rstrip(_STATE_FLAGS)
+    return not base.startswith(_UNAVAILABLE) and not _UNAVAILABLE_FLAGS & set(state[len(base):])
+
+@dataclass
+class PartitionUsage:
+    server: str
+    partition: str
+    nodes: int = 0
+    nodes_up: int = 0
+    gpus: int = 0
+    gpus_used: int = 0
+    gpus_idle: int = 0  # Free GPUs on nodes that accept jobs
+    running: int = 0
+    pending: int = 0
+    mine_pending: int = 0
+    default: bool = False  # Where jobs go that don't ask for a partition
+
+def build_resources_command() -> str:
+    # sshare fails on clusters without accounting; that mustn't fail the whole call
+    return (
+        f"{settings.SLURM_CMD_SINFO} -h -N -O \"{_SINFO_FIELDS}\"; echo {_SQUEUE_MARKER}; "
+        f"{settings.SLURM_CMD_SQUEUE} -h -t PD,R -o \"%P|%t|%u\"; echo {_SSHARE_MARKER}; "
+        f"{settings.SLURM_CMD_SSHARE} -h -P -o User,FairShare 2>/dev/null || true"
+    )
+
+def _gpu_count(gres: str) -> int:
+    """GPUs in a Gres/GresUsed value such as `gpu:a100:4(S:0-1),gpu:v100:2` or `gpu:0`."""
+    total = 0
+    for entry in gres.split(","):
+        entry = entry.split("(", 1)[0]
+        if entry.startswith("gpu"):
+            count = entry.rsplit(":", 1)[-1]
+            if count.isdigit():
+                total += int(count)
+    return total
+
+def parse_fairshare(output: str, user: str) -> Optional[float]:
+    """The FairShare factor (0-1) of `user` from the sshare section of `build_resources_command` output."""
+    _, _, sshare = output.partition(_SSHARE_MARKER)
+    for line in sshare.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 2 and fields[0] == user:
+            try:
+                return float(fields[1])
+            except ValueError:
+                return None
+    return None
+
+def parse_resources(server: str, output: str, user: str) -> List[PartitionUsage]:
+    output, _, _ = output.partition(_SSHARE_MARKER)
+    sinfo, _, squeue = output.partition(_SQUEUE_MARKER)
+    partitions: Dict[str, PartitionUsage] = {}
+
+    def usage(name: str) -> PartitionUsage:
+        default = name.endswith("*")  # The default partition is starred
+        name = name.rstrip("*")
+        if name not in partitions:
+            partitions[name] = PartitionUsage(server, name)
+        partitions[name].default |= default
+        return partitions[name]
+
+    # One line per (node, partition)
+    for line in sinfo.splitlines():
+        fields = line.split()
+        if len(fields) != 5:
+            continue
+        _, partition, state, gres, gres_used = fields
+        row = usage(partition)
+        gpus, used = _gpu_count(gres), _gpu_count(gres_used)
+        row.nodes += 1
+        row.gpus += gpus
+        row.gpus_used += used
+        if _node_available(state):
+            row.nodes_up += 1
+            row.gpus_idle += max(0, gpus - used)
+
+    for line in squeue.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) != 3:
+            continue
+        partition_list, state, job_user = fields
+        # Pending jobs may list several partitions; they count in each
+        for partition in partition_list.split(","):
+            row = usage(partition)
+            if state == "R":
+                row.running += 1
+            elif state == "PD":
+                row.pending += 1
+                if job_user == user:
+                    row.mine_pending += 1
+
+    return list(partitions.values())
+
+def _format_age(seconds: float) -> str:
+    return f"{seconds:.0f}s" if seconds < 120 else f"{seconds / 60:.0f} min"
+
+class ClusterDashboard:
+    """
+    Free and busy resources per partition on every server in SSH_SERVERS.
+
+    One SSH call per server runs sinfo, squeue and sshare, and all servers are
+    queried concurrently. Readers are served from the last snapshot; once it is
+    older than `max_age` the next read starts a refresh in the background
+    (one at a time), so a read never waits on the clusters unless there is no
+    snapshot yet.
+    """
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._rows: Dict[str, List[PartitionUsage]] = {}
+        self._fairshare: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self.refreshed_at: Optional[float] = None  # Monotonic time of the last completed refresh
+        self._refresh: Optional[asyncio.Task] = None
+
+    @property
+    def servers(self) -> List[str]:
+        return settings.server_names
+
+    @property
+    def has_snapshot(self) -> bool:
+        return self.refreshed_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at > self.max_age
+
+    def rows(self, server: Optional[str] = None) -> List[PartitionUsage]:
+        if server is not None:
+            return list(self._rows.get(server, ()))
+        return [row for rows in self._rows.values() for row in rows]
+
+    def fairshare(self, server: str) -> Optional[float]:
+        return self._fairshare.get(server)
+
+    def errors(self) -> Dict[str, str]:
+        return dict(self._errors)
+
+    def refresh(self) -> asyncio.Task:
+        """Start refreshing every server, unless a refresh is already running. Returns its task."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().create_task(self._refresh_all())
+        return self._refresh
+
+    def refresh_if_stale(self) -> Optional[asyncio.Task]:
+        return self.refresh() if self.is_stale else None
+
+    async def _refresh_all(self):
+        results = await asyncio.gather(*(self._fetch(server) for server in self.servers))
+        for server, output, error in results:
+            if error:
+                # Keep the last known rows of a server that couldn't be read
+                self._errors[server] = error
+                continue
+            self._rows[server] = parse_resources(server, output, settings.SSH_USER)
+            fairshare = parse_fairshare(output, settings.SSH_USER)
+            if fairshare is None:
+                self._fairshare.pop(server, None)
+            else:
+                self._fairshare[server] = fairshare
+            self._errors.pop(server, None)
+        # Drop servers no longer configured
+        for server in self._rows.keys() - set(self.servers):
+            del self._rows[server]
+            self._fairshare.pop(server, None)
+        self.refreshed_at = time.monotonic()
+
+    async def _fetch(self, server: str) -> Tuple[str, str, str]:
+        """(server, output, error); `error` is empty when the output can be parsed."""
+        result = await run_remote_command(server, build_resources_command(), kind="resources")
+        if not result.ok:
+            output = result.text.strip()
+            return server, "", output.splitlines()[0] if output else "No output"
+        return server, result.text, ""
+
+    def render(self) -> str:
+        rows = sorted(self.rows(), key=lambda r: (-r.gpus_idle, r.pending, r.server, r.partition))
+        age = time.monotonic() - self.refreshed_at if self.refreshed_at is not None else 0
+        lines = [f"🖥️ *Cluster resources* · updated {_format_age(age)} ago"]
+
+        if rows:
+            table = [("SERVER", "PARTITION", "GPU IDLE/ALL", "NODES UP", "RUN", "PEND", "MINE")] + [
+                (r.server, r.partition, f"{r.gpus_idle}/{r.gpus}", f"{r.nodes_up}/{r.nodes}",
+                 str(r.running), str(r.pending), str(r.mine_pending))
+                for r in rows
+            ]
+            widths = [max(len(row[i]) for row in table) for i in range(len(table[0]))]
+            body = "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in table)
+            lines.append(f"```{body}```")
+        else:
+            lines.append("No partitions reported yet.")
+
+        if self._fairshare:
+            shares = " · ".join(f"`{server}` {share:.2f}" for server, share in sorted(self._fairshare.items()))
+            lines.append(f"⚖️ Fairshare: {shares}")
+        for server, error in sorted(self._errors.items()):
+            lines.append(f"⚠️ `{server}`: {error}")
+        return "\n".join(lines)
+
+cluster_dashboard: ClusterDashboard = Lazy(lambda: ClusterDashboard(max_age=settings.DASHBOARD_REFRESH_INTERVAL))
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from .config import Lazy, settings
+from .metrics import DISPATCH_QUEUE_WAIT_SECONDS, DISPATCH_REJECTED
+
+BUSY_MESSAGE = "🚦 Too many commands are in flight right now. Please try again in a moment."
+
+Job = Tuple[str, Callable[..., Awaitable[Any]], tuple, dict]  # (server, func, args, kwargs)
+
+@dataclass
+class _WorkItem:
+    user: str
+    server: str
+    func: Callable[..., Awaitable[Any]]
+    args: tuple
+    kwargs: dict
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class DispatchQueue:
+    """
+    Bounded in-process queue for remote work launched from Slack commands.
+
+    - At most `max_depth` items wait at once; `submit` returns False beyond that
+      so the caller can answer "busy" immediately instead of piling up work.
+    - At most `per_server_limit` items run concurrently against one server.
+    - Users are served round-robin, so one user's burst can't starve others.
+    """
+    def __init__(self, max_depth: int, workers: int, per_server_limit: int):
+        self.max_depth = max_depth
+        self.workers = workers
+        self.per_server_limit = per_server_limit
+        self._pending: "OrderedDict[str, Deque[_WorkItem]]" = OrderedDict()
+        self._depth = 0
+        self._active: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        # Queue-time statistics
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def start(self):
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, user: str, server: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+        """Queue `func(*args, **kwargs)` to run against `server`. Returns False if the queue is full."""
+        return self.submit_many(user, [(server, func, args, kwargs)])
+
+    def submit_many(self, user: str, jobs: List[Job]) -> bool:
+        """Queue several jobs for one user, all or none. Returns False if they don't fit."""
+        if self._depth + len(jobs) > self.max_depth:
+            self.rejected += len(jobs)
+            DISPATCH_REJECTED.inc(len(jobs))
+            return False
+
+        queue = self._pending.setdefault(user, deque())
+        for server, func, args, kwargs in jobs:
+            queue.append(_WorkItem(user, server, func, args, kwargs))
+        self._depth += len(jobs)
+
+        if self._wakeup:
+            self._wakeup.set()
+        return True
+
+    @property
+    def running(self) -> int:
+        return sum(self._active.values())
+
+    def stats(self) -> dict:
+        return {
+            "depth": self._depth,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait": self.total_wait / self.completed if self.completed else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    def _take_next(self) -> Optional[_WorkItem]:
+        """Pop the next runnable item, rotating across users and skipping saturated servers."""
+        for user in list(self._pending):
+            queue = self._pending[user]
+            for item in queue:
+                if self._active.get(item.server, 0) < self.per_server_limit:
+                    queue.remove(item)
+                    self._depth -= 1
+                    # Move this user to the back of the line
+                    del self._pending[user]
+                    if queue:
+                        self._pending[user] = queue
+                    return item
+        return None
+
+    async def _worker(self):
+        while True:
+            item = self._take_next()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            wait = time.monotonic() - item.enqueued_at
+            DISPATCH_QUEUE_WAIT_SECONDS.observe(wait)
+            self._active[item.server] = self._active.get(item.server, 0) + 1
+            try:
+                await item.func(*item.args, **item.kwargs)
+            except Exception as e:
+                print(f"⚠️ Dispatched job for {item.user} on {item.server} failed: {e}")
+            finally:
+                self._active[item.server] -= 1
+                self.completed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                # A server slot was freed; items waiting on it may run now
+                self._wakeup.set()
+
+dispatch_queue: DispatchQueue = Lazy(lambda: DispatchQueue(
+    max_depth=settings.DISPATCH_QUEUE_DEPTH,
+    workers=settings.DISPATCH_WORKERS,
+    per_server_limit=settings.DISPATCH_PER_SERVER_LIMIT
+))
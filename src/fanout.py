@@ -0,0 +1,124 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from .config import settings
+from .metrics import FANOUT_SECONDS
+from .slack_client import slack_client
+from .ssh_client import Outcome, run_remote_command
+
+MAX_TAIL_CHARS = 80  # Last output line shown per server
+
+@dataclass
+class ServerResult:
+    server: str
+    status: str = "queued"  # queued, running, ok, error, timeout, unreachable, skipped
+    duration: Optional[float] = None
+    output: str = ""
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ("queued", "running")
+
+    @property
+    def tail(self) -> str:
+        lines = [line.strip() for line in self.output.splitlines() if line.strip()]
+        if not lines:
+            return ""
+        last = lines[-1]
+        return last if len(last) <= MAX_TAIL_CHARS else "…" + last[-MAX_TAIL_CHARS:]
+
+_STATUS = {
+    Outcome.OK: "ok",
+    Outcome.ERROR: "error",
+    Outcome.TIMEOUT: "timeout",
+    Outcome.DEAD: "unreachable",
+    Outcome.SYSTEM_ERROR: "unreachable",
+}
+
+class FanOut:
+    """
+    One command run on several servers, reported as a single Slack message.
+
+    Each server is its own dispatch queue job calling `run`, so per-server limits
+    and fairness between users still apply, but all of them share one deadline:
+    a server whose turn comes after it is skipped, one still running is cut off.
+    The results table is posted when the first server finishes and replaced in
+    place as the others do, at most every STREAM_UPDATE_INTERVAL seconds and
+    within the STREAM_MAX_UPDATES posts a response_url accepts; the last post is
+    always the complete table.
+    """
+    def __init__(self, title: str, servers: List[str], response_url: str, deadline: float):
+        self.title = title
+        self.response_url = response_url
+        self.timeout = deadline
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline
+        self.results: Dict[str, ServerResult] = {server: ServerResult(server) for server in servers}
+        self._pending = len(self.results)
+        self._posts = 0
+        self._last_post = 0.0
+        self._update: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def run(self, server: str, cmd: str):
+        """Run `cmd` on `server` within the shared deadline and publish the result."""
+        result = self.results[server]
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            result.status = "skipped"
+        else:
+            result.status = "running"
+            started = time.monotonic()
+            remote = await run_remote_command(server, cmd, timeout=remaining)
+            result.output = remote.text
+            result.duration = time.monotonic() - started
+            result.status = _STATUS[remote.outcome]
+
+        self._pending -= 1
+        if self._pending == 0:
+            FANOUT_SECONDS.observe(time.monotonic() - self.started)
+            async with self._lock:
+                await self._post()
+        elif self._update is None or self._update.done():
+            self._update = asyncio.create_task(self._post_update())
+
+    async def _post_update(self):
+        # Keep one post in reserve for the final table
+        if self._posts >= settings.STREAM_MAX_UPDATES - 1:
+            return
+        if self._posts:
+            await asyncio.sleep(max(0.0, self._last_post + settings.STREAM_UPDATE_INTERVAL - time.monotonic()))
+        async with self._lock:
+            # The final table may have gone out while this update was waiting
+            if self._pending:
+                await self._post()
+
+    async def _post(self):
+        await slack_client.post_response(self.response_url, {"text": self.render(), "replace_original": self._posts > 0})
+        self._posts += 1
+        self._last_post = time.monotonic()
+
+    def render(self) -> str:
+        results = list(self.results.values())
+        finished = sum(result.done for result in results)
+        elapsed = time.monotonic() - self.started
+        header = f"{self.title} · {finished}/{len(results)} servers done · {elapsed:.1f}s"
+
+        rows = [("SERVER", "STATUS", "TIME", "OUTPUT")] + [
+            (r.server, r.status, f"{r.duration:.1f}s" if r.duration is not None else "-", r.tail)
+            for r in results
+        ]
+        widths = [max(len(row[i]) for row in rows) for i in range(3)]
+        table = "\n".join(
+            ("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) + f"  {row[3]}").rstrip()
+            for row in rows
+        )
+
+        text = f"{header}\n```{table}```"
+        if finished == len(results):
+            ok = sum(r.status == "ok" for r in results)
+            text += f"\n✅ {ok} ok" + (f" · ❌ {len(results) - ok} failed" if ok < len(results) else "")
+            if any(r.status in ("timeout", "skipped") for r in results):
+                text += f"\n⏱️ Stopped at the {self.timeout:g}s deadline."
+        return text
@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+
+JobRow = Tuple[str, str, Dict]  # (server, job_id, data)
+
+class JobStore:
+    """
+    Durable storage for monitored jobs, so bindings survive restarts.
+
+    Backed by SQLite in WAL mode with `synchronous=NORMAL`: a write on the hot
+    path is a single small upsert that doesn't wait for an fsync. The monitor
+    serves reads from memory and reloads only when another process (e.g. a
+    second web worker binding a job) has written, see `data_version`.
+    """
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                server TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT '',
+                data TEXT NOT NULL DEFAULT '{}',
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (server, job_id)
+            ) WITHOUT ROWID
+            """
+        )
+        # Lookups by server use the primary key prefix
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        # Servers whose newly submitted jobs are bound automatically
+        self._conn.execute("CREATE TABLE IF NOT EXISTS auto_bind (server TEXT PRIMARY KEY)")
+
+    def upsert(self, server: str, job_id: str, data: Dict):
+        """Insert or replace a job. `data` must be JSON-serializable; its "status" is also indexed."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (server, job_id, status, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (server, job_id, data.get("status", ""), json.dumps(data), time.time())
+            )
+
+    def insert(self, server: str, job_id: str, data: Dict) -> bool:
+        """Insert a job unless it is already stored. Returns whether it was inserted."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (server, job_id, status, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (server, job_id, data.get("status", ""), json.dumps(data), time.time())
+            )
+            return cursor.rowcount > 0
+
+    def update(self, server: str, job_id: str, data: Dict) -> bool:
+        """Overwrite an existing job. Returns False, writing nothing, if it was deleted meanwhile."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, data = ?, updated_at = ? WHERE server = ? AND job_id = ?",
+                (data.get("status", ""), json.dumps(data), time.time(), server, job_id)
+            )
+            return cursor.rowcount > 0
+
+    def delete(self, server: str, job_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE server = ? AND job_id = ?", (server, job_id))
+            return cursor.rowcount > 0
+
+    def load_all(self) -> List[JobRow]:
+        return self._query("SELECT server, job_id, data FROM jobs")
+
+    def by_server(self, server: str) -> List[JobRow]:
+        return self._query("SELECT server, job_id, data FROM jobs WHERE server = ?", (server,))
+
+    def by_status(self, status: str) -> List[JobRow]:
+        return self._query("SELECT server, job_id, data FROM jobs WHERE status = ?", (status,))
+
+    def set_auto_bind(self, server: str, enabled: bool):
+        with self._lock:
+            if enabled:
+                self._conn.execute("INSERT OR IGNORE INTO auto_bind (server) VALUES (?)", (server,))
+            else:
+                self._conn.execute("DELETE FROM auto_bind WHERE server = ?", (server,))
+
+    def auto_bind_servers(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT server FROM auto_bind")]
+
+    def data_version(self) -> int:
+        """Changes whenever another connection, in this process or another, commits to the database."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _query(self, sql: str, params: tuple = ()) -> List[JobRow]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(server, job_id, json.loads(data)) for server, job_id, data in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,153 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from .log_tail import LineBuffer
+
+JobKey = Tuple[str, str]  # (server, job_id)
+
+class JobRecord:
+    """Monitor state of one bound job. Slotted, since thousands may be tracked at once."""
+    __slots__ = (
+        "server", "job_id", "status", "last_epoch", "last_steps", "log_path", "log_inode", "log_offset",
+        "pending_since", "poll_interval", "activity", "log_buffer",
+    )
+
+    def __init__(self, server: str, job_id: str):
+        self.server = server
+        self.job_id = job_id
+        self.status = ""
+        self.last_epoch = -1
+        self.last_steps: Optional[Dict[str, int]] = None  # Highest step seen per metric
+        self.log_path: Optional[str] = None  # None: not resolved yet, "": no StdOut file
+        self.log_inode = ""
+        self.log_offset = 0
+        # Runtime-only: scheduling hints and the trailing partial log line
+        self.pending_since: Optional[float] = None
+        self.poll_interval: Optional[float] = None
+        self.activity = False
+        self.log_buffer: Optional[LineBuffer] = None
+
+    @property
+    def key(self) -> JobKey:
+        return (self.server, self.job_id)
+
+    @classmethod
+    def from_store(cls, server: str, job_id: str, data: Dict) -> "JobRecord":
+        record = cls(server, job_id)
+        record.status = data.get("status", "")
+        record.last_epoch = data.get("last_epoch", -1)
+        record.last_steps = data.get("last_steps")
+        record.log_path = data.get("log_path")
+        record.log_inode = data.get("log_inode", "")
+        record.log_offset = data.get("log_offset", 0)
+        return record
+
+    def to_store(self) -> Dict:
+        data = {"status": self.status, "last_epoch": self.last_epoch, "log_inode": self.log_inode}
+        if self.last_steps:
+            data["last_steps"] = self.last_steps
+        if self.log_path is not None:
+            data["log_path"] = self.log_path
+        # Resume at the start of the incomplete line so it's re-read after a restart
+        data["log_offset"] = self.log_offset - (self.log_buffer.pending_bytes if self.log_buffer else 0)
+        return data
+
+class JobView(NamedTuple):
+    """Immutable copy of the fields of a job shown to users."""
+    server: str
+    job_id: str
+    status: str
+    last_epoch: int
+
+JobsByServer = Dict[str, Tuple[JobView, ...]]
+
+class JobTable:
+    """
+    Bound jobs, indexed by key, by server and by state.
+
+    Not thread-safe: the monitor mutates it under its own lock, and must go
+    through `set_status` (which keeps the state index current) and `touch`
+    when a field shown in `JobView` changes. Readers use `snapshot`, an
+    immutable copy rebuilt only after such a change; `cached_snapshot` returns
+    it without any lock as long as it is current.
+    """
+    def __init__(self, records: Optional[List[JobRecord]] = None):
+        self._jobs: Dict[JobKey, JobRecord] = {}
+        self._by_server: Dict[str, Dict[str, JobRecord]] = {}
+        self._by_state: Dict[str, Set[JobKey]] = {}
+        self._version = 0
+        self._snapshot: Tuple[int, JobsByServer] = (0, {})
+        for record in records or ():
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: JobKey) -> bool:
+        return key in self._jobs
+
+    def __iter__(self) -> Iterator[JobKey]:
+        return iter(self._jobs)
+
+    def keys(self):
+        return self._jobs.keys()
+
+    def get(self, key: JobKey) -> Optional[JobRecord]:
+        return self._jobs.get(key)
+
+    def add(self, record: JobRecord):
+        """Insert `record`, replacing any record with the same key."""
+        self.remove(record.key)
+        self._jobs[record.key] = record
+        self._by_server.setdefault(record.server, {})[record.job_id] = record
+        self._by_state.setdefault(record.status, set()).add(record.key)
+        self._version += 1
+
+    def remove(self, key: JobKey) -> Optional[JobRecord]:
+        record = self._jobs.pop(key, None)
+        if record is None:
+            return None
+        server_jobs = self._by_server[record.server]
+        del server_jobs[record.job_id]
+        if not server_jobs:
+            del self._by_server[record.server]
+        self._discard_state(record)
+        self._version += 1
+        return record
+
+    def on_server(self, server: str) -> List[JobRecord]:
+        return list(self._by_server.get(server, {}).values())
+
+    def in_state(self, status: str) -> List[JobRecord]:
+        return [self._jobs[key] for key in self._by_state.get(status, ())]
+
+    def set_status(self, record: JobRecord, status: str):
+        if record.key in self._jobs:
+            self._discard_state(record)
+            self._by_state.setdefault(status, set()).add(record.key)
+        record.status = status
+        self._version += 1
+
+    def touch(self):
+        """Mark the snapshot stale after a change to a field shown in `JobView`."""
+        self._version += 1
+
+    def cached_snapshot(self) -> Optional[JobsByServer]:
+        version, snapshot = self._snapshot
+        return snapshot if version == self._version else None
+
+    def snapshot(self) -> JobsByServer:
+        """Jobs grouped by server, as immutable views. Caller must hold the owner's lock."""
+        snapshot = self.cached_snapshot()
+        if snapshot is None:
+            snapshot = {
+                server: tuple(JobView(r.server, r.job_id, r.status, r.last_epoch) for r in jobs.values())
+                for server, jobs in self._by_server.items()
+            }
+            self._snapshot = (self._version, snapshot)
+        return snapshot
+
+    def _discard_state(self, record: JobRecord):
+        keys = self._by_state.get(record.status)
+        if keys is not None:
+            keys.discard(record.key)
+            if not keys:
+                del self._by_state[record.status]
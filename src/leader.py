@@ -0,0 +1,64 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+class LeaderLease:
+    """
+    Time-bound leadership of `name`, shared by every process that opens the same SQLite file.
+
+    At most one holder owns the lease at a time. The holder keeps it by calling
+    `try_acquire` again well within `ttl`; if it crashes or hangs, the lease expires
+    and another process takes over on its next attempt.
+    """
+    def __init__(self, path: str, name: str, ttl: float, holder: Optional[str] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def try_acquire(self) -> bool:
+        """Take the lease if it's free or expired, or renew it if already held. Returns whether it's held."""
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    """
+                    INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+                    WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+                    """,
+                    (self.name, self.holder, now + self.ttl, now)
+                )
+                row = self._conn.execute("SELECT holder FROM leases WHERE name = ?", (self.name,)).fetchone()
+        except sqlite3.OperationalError as e:
+            # Database locked for too long; count as not held so two leaders never overlap
+            print(f"⚠️ Could not renew the {self.name} lease: {e}")
+            return False
+        return row is not None and row[0] == self.holder
+
+    def release(self):
+        """Give up the lease so another process can take over immediately."""
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+TAIL_MARKER = "__SHIBA_TAIL__"
+JOB_MARKER = "__SHIBA_JOB__"
+
+# Paths are interpolated into a remote shell command; anything fancier falls back to `show`.
+_SAFE_PATH = re.compile(r"^[\w./+=@:,~-]+$")
+_STDOUT_PATTERN = re.compile(r"\bStdOut=(\S+)")
+
+@dataclass
+class TailChunk:
+    inode: str
+    size: int
+    offset: int  # Offset the data starts at; 0 after the file was replaced or truncated
+    length: int  # Bytes read from the file, which is what the next offset advances by
+    data: str
+
+    @property
+    def end_offset(self) -> int:
+        return self.offset + self.length
+
+def build_stdout_path_command(job_id: str) -> str:
+    return f"scontrol show job {job_id}"
+
+def build_show_tail_command(job_id: str, lines: int = 20) -> str:
+    """Last lines of the job's log through `show`, for jobs whose output file can't be resolved."""
+    return f"show {job_id} | tail -n {lines}"
+
+def build_batch_command(commands: List[Tuple[str, str]]) -> str:
+    """
+    Run the command of several jobs in one remote call. Each runs in a subshell
+    (so an `exit` only ends its own part) with stderr merged, after a marker line
+    carrying its job ID. The script always succeeds, so one failing job doesn't
+    turn the output of the others into an error.
+    """
+    parts = [f'printf "\\n{JOB_MARKER} %s\\n" {job_id}; ( {cmd} ) 2>&1' for job_id, cmd in commands]
+    return "; ".join(parts + ["true"])
+
+def split_batch_output(output: str) -> Dict[str, str]:
+    """Output of `build_batch_command` per job ID."""
+    sections = {}
+    for section in output.split(f"\n{JOB_MARKER} ")[1:]:
+        job_id, _, data = section.partition("\n")
+        sections[job_id.strip()] = data
+    return sections
+
+def parse_stdout_path(output: str) -> Optional[str]:
+    """Extract the job's output file from `scontrol show job` output."""
+    match = _STDOUT_PATTERN.search(output)
+    if not match:
+        return None
+
+    path = match.group(1)
+    # Unexpanded filename patterns (%j, %A, ...) can't be read directly
+    if "%" in path or not _SAFE_PATH.match(path):
+        return None
+    return path
+
+def build_tail_command(path: str, inode: str, offset: int, max_bytes: int) -> str:
+    """
+    Build a command that prints a marker line followed by at most `max_bytes` new bytes
+    of `path`, starting at `offset`. The remote side restarts from 0 if the file's inode
+    changed or it shrank (job requeued, log rotated).
+    """
+    return (
+        f'f="{path}"; set -- $(stat -c "%i %s" "$f" 2>/dev/null); '
+        f'if [ -z "$2" ]; then echo "{TAIL_MARKER} missing"; exit 0; fi; '
+        f'off={offset}; if [ "$1" != "{inode}" ] || [ "$2" -lt "$off" ]; then off=0; fi; '
+        f'n=$(($2 - off)); if [ "$n" -gt {max_bytes} ]; then n={max_bytes}; fi; '
+        f'echo "{TAIL_MARKER} $1 $2 $off $n"; '
+        f'tail -c +$((off + 1)) "$f" 2>/dev/null | head -c "$n"'
+    )
+
+def parse_tail_output(output: str) -> Optional[TailChunk]:
+    """Parse the output of `build_tail_command`; None if the marker is missing or the file is gone."""
+    start = output.find(TAIL_MARKER)
+    if start == -1:
+        return None
+
+    header, _, rest = output[start:].partition("\n")
+    fields = header.split()
+    if len(fields) != 5:
+        return None
+
+    _, inode, size, offset, length = fields
+    # Drop anything appended after the payload (e.g. stderr of the login shell)
+    data = rest.encode()[:int(length)].decode(errors="ignore")
+    return TailChunk(inode=inode, size=int(size), offset=int(offset), length=int(length), data=data)
+
+class LineBuffer:
+    """
+    Reassembles complete lines from arbitrary chunks of a growing log.
+    The trailing partial line is kept until the rest of it arrives.
+    """
+    __slots__ = ("_partial", "max_partial")
+
+    def __init__(self, max_partial: int = 65536):
+        self._partial = ""
+        self.max_partial = max_partial
+
+    def feed(self, chunk: str) -> List[str]:
+        # Progress bars redraw with \r; treat it as a line break
+        data = (self._partial + chunk).replace("\r", "\n")
+        lines = data.split("\n")
+        self._partial = lines.pop()[-self.max_partial:]
+        return [line for line in lines if line]
+
+    @property
+    def pending_bytes(self) -> int:
+        """Size of the buffered partial line, as it was in the file."""
+        return len(self._partial.encode())
+
+    def reset(self):
+        self._partial = ""
@@ -0,0 +1,77 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple
+from .config import get_settings
+
+_GROUP_NAME = re.compile(r"\(\?P([<=])(\w+)")
+_REQUIRED_GROUPS = ("step", "value")
+
+class MetricRecord(NamedTuple):
+    name: str
+    step: int
+    value: float
+    experiment: str
+
+class MetricExtractor:
+    """
+    Extracts typed metric records from log text with a single combined regex.
+
+    Each pattern is a dict with:
+      - "pattern": regex with named groups `step` and `value`, and optionally
+        `experiment` and `name` (to take the metric name from the log line).
+      - "name": metric name, used when the regex has no `name` group.
+      - "step_label": how steps are called in notifications (default "Step").
+
+    All patterns are compiled once into one alternation, so a chunk of log
+    output is scanned in a single pass no matter how many metrics are declared.
+    """
+    def __init__(self, patterns: List[Dict[str, str]]):
+        self.step_labels: Dict[str, str] = {}
+        self._names: List[str] = []
+        alternatives = []
+
+        for i, spec in enumerate(patterns):
+            pattern = spec["pattern"]
+            groups = set(re.compile(pattern).groupindex)
+            missing = [g for g in _REQUIRED_GROUPS if g not in groups]
+            if missing:
+                raise ValueError(f"Metric pattern {spec.get('name', pattern)!r} lacks groups: {', '.join(missing)}")
+
+            name = spec.get("name", "")
+            self._names.append(name)
+            self.step_labels[name] = spec.get("step_label", "Step")
+
+            # Prefix group names so the patterns can share one regex
+            prefixed = _GROUP_NAME.sub(lambda m: f"(?P{m.group(1)}p{i}_{m.group(2)}", pattern)
+            alternatives.append(f"(?P<p{i}>{prefixed})")
+
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def extract(self, text: str) -> List[MetricRecord]:
+        """Return every metric record in `text`, in log order."""
+        if self._regex is None:
+            return []
+
+        records = []
+        for match in self._regex.finditer(text):
+            # The wrapping group closes last, so it identifies the pattern that matched
+            i = int(match.lastgroup[1:])
+            groups = match.groupdict()
+            try:
+                records.append(MetricRecord(
+                    name=groups.get(f"p{i}_name") or self._names[i],
+                    step=int(groups[f"p{i}_step"]),
+                    value=float(groups[f"p{i}_value"]),
+                    experiment=(groups.get(f"p{i}_experiment") or "").strip()
+                ))
+            except (TypeError, ValueError):
+                continue
+        return records
+
+    def step_label(self, name: str) -> str:
+        return self.step_labels.get(name, "Step")
+
+@lru_cache()
+def get_extractor() -> MetricExtractor:
+    """Extractor for the patterns in METRIC_PATTERNS."""
+    return MetricExtractor(get_settings().METRIC_PATTERNS)
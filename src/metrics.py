@@ -0,0 +1,188 @@
+"""
+Minimal Prometheus-style metrics: counters, gauges and histograms with labels,
+rendered in the text exposition format by `render()` for the /metrics endpoint.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+_registry: List["_Metric"] = []
+_registry_lock = threading.Lock()
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Gauge(_Metric):
+    """A gauge set explicitly, or read from `callback` at scrape time."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        if self._callback is not None:
+            lines.append(f"{self.name} {self._callback()}")
+            return lines
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, float("inf")), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total[0]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Metrics of the bot ---
+
+SSH_COMMAND_SECONDS = Histogram(
+    "shiba_ssh_command_duration_seconds", "Latency of remote commands.", ("server", "command")
+)
+SSH_COMMANDS = Counter(
+    "shiba_ssh_commands_total", "Remote commands by outcome (ok, error, timeout, dead).", ("server", "outcome")
+)
+MONITOR_TICK_SECONDS = Histogram(
+    "shiba_monitor_tick_duration_seconds", "Time spent scheduling one monitor tick."
+)
+MONITOR_POLL_SECONDS = Histogram(
+    "shiba_monitor_poll_duration_seconds", "Duration of one monitor poll of a server.", ("server",)
+)
+MONITOR_JOBS_PER_POLL = Histogram(
+    "shiba_monitor_jobs_per_poll", "Jobs checked by one monitor poll of a server.", ("server",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+MONITOR_JOBS_POLLED = Counter(
+    "shiba_monitor_jobs_polled_total", "Job status checks made by the monitor.", ("server",)
+)
+METRIC_PARSE_SECONDS = Histogram(
+    "shiba_metric_parse_duration_seconds", "Time spent extracting metrics from new log output.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+)
+CLUSTER_EVENTS = Counter(
+    "shiba_cluster_events_total", "Job events found by diffing queue snapshots.", ("kind",)
+)
+SLACK_POST_SECONDS = Histogram(
+    "shiba_slack_post_duration_seconds", "Latency of Slack API posts.", ("kind",)
+)
+SLACK_POST_FAILURES = Counter(
+    "shiba_slack_post_failures_total", "Failed Slack posts by reason.", ("kind", "reason")
+)
+SLACK_RATE_LIMITED = Counter(
+    "shiba_slack_rate_limited_total", "HTTP 429 responses received from Slack.", ("kind",)
+)
+STARTUP_SECONDS = Gauge(
+    "shiba_startup_seconds", "Seconds from the start of the app import to each startup phase.", ("phase",)
+)
+DISPATCH_REQUESTS = Counter(
+    "shiba_dispatch_requests_total", "Slash commands received.", ("command",)
+)
+DISPATCH_REQUEST_SECONDS = Histogram(
+    "shiba_dispatch_request_duration_seconds", "Time to acknowledge a slash command.", ("command",)
+)
+DISPATCH_QUEUE_WAIT_SECONDS = Histogram(
+    "shiba_dispatch_queue_wait_seconds", "Time queued work waited for a worker."
+)
+FANOUT_SECONDS = Histogram(
+    "shiba_fanout_duration_seconds", "Wall time of a multi-server command, from dispatch to its last server.",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+)
+DISPATCH_REJECTED = Counter(
+    "shiba_dispatch_rejected_total", "Remote commands rejected because the dispatch queue was full."
+)
@@ -1,178 +1,575 @@
+import asyncio
 import threading
 import time
-import httpx
-import re
-from typing import Dict, Tuple, Optional
-from .ssh_client import execute_remote_command
-from .config import get_settings
+from typing import Dict, List, Set, Tuple, Optional
+from .accounting import accounting, describe
+from .cluster_state import ACTIVE_STATES, EventKind, JobEvent, QueuedJob, cluster_state
+from .ssh_client import run_remote_command, server_label
+from .config import Lazy, get_settings
+from .log_tail import (
+    LineBuffer, TailChunk, build_batch_command, build_show_tail_command, build_stdout_path_command,
+    build_tail_command, parse_stdout_path, parse_tail_output, split_batch_output
+)
+from .job_store import JobStore
+from .job_table import JobRecord, JobsByServer, JobTable, JobView
+from .leader import LeaderLease
+from .metric_extractor import MetricRecord, get_extractor
+from .metrics import METRIC_PARSE_SECONDS, MONITOR_JOBS_PER_POLL, MONITOR_JOBS_POLLED, MONITOR_POLL_SECONDS, MONITOR_TICK_SECONDS
+from .slack_client import slack_client
+from .timeseries import metric_history
+from .scheduler import PollScheduler
+
+# Jobs whose log commands share one remote script; keeps it well below the 128 KiB argument limit
+LOG_BATCH_SIZE = 50
 
 class JobMonitor:
+    """
+    Polls the jobs bound from Slack and reports state changes and new metrics.
+
+    Every web worker has one, but only the holder of the "monitor" lease polls;
+    the others just read and write bindings through the shared job store.
+    """
     def __init__(self):
-        self._jobs: Dict[Tuple[str, str], Dict] = {}
+        self._jobs = JobTable()
         self._lock = threading.Lock()
         self._running = False
-        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
         self.settings = get_settings()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Per-job due times; polls of one server run as one task at a time
+        self._scheduler = PollScheduler()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._server_failures: Dict[str, int] = {}
+        self._extractor = get_extractor()
+        self._store = JobStore(self.settings.JOB_STORE_PATH)
+        self._lease = LeaderLease(self.settings.LEASE_DB_PATH, "monitor", ttl=self.settings.MONITOR_LEASE_TTL)
+        self._leader = False
+        self._lease_renew_at = 0.0
+        self._data_version: Optional[int] = None
+        # Servers whose new jobs are bound as they appear, and when their queue is next read
+        self._auto_bind: Set[str] = set()
+        self._watch_due: Dict[str, float] = {}
+        # Jobs that left the queue, per server, awaiting one batched sacct lookup
+        self._finished: Dict[str, List[Tuple[str, str]]] = {}
+        self._report_tasks: Set[asyncio.Task] = set()
+        self._sync()
+        cluster_state.subscribe(self._on_cluster_event)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    def _restore(self):
+        """Take over every binding in the store, e.g. after a restart or a leader change."""
+        now = time.monotonic()
+        with self._lock:
+            self._jobs = JobTable([JobRecord.from_store(*row) for row in self._store.load_all()])
+            self._scheduler = PollScheduler()
+            for key in self._jobs:
+                self._scheduler.schedule(key, now)
+            self._server_failures.clear()
+            self._auto_bind = set(self._store.auto_bind_servers())
+            self._watch_due.clear()
+        if self._jobs:
+            print(f"♻️ Restored {len(self._jobs)} monitored jobs from {self.settings.JOB_STORE_PATH}")
+
+    def _sync(self):
+        """
+        Pick up bindings written by other workers. A no-op unless the store changed.
+        The leader keeps its own state for jobs it already polls; followers mirror the store.
+        """
+        version = self._store.data_version()
+        if version == self._data_version:
+            return
+        self._data_version = version
+        rows = {(server, job_id): data for server, job_id, data in self._store.load_all()}
+        auto_bind = set(self._store.auto_bind_servers())
+
+        now = time.monotonic()
+        with self._lock:
+            self._auto_bind = auto_bind
+            if not self._leader:
+                self._jobs = JobTable([JobRecord.from_store(*key, data) for key, data in rows.items()])
+                return
+            for key in self._jobs.keys() - rows.keys():
+                self._jobs.remove(key)
+                self._scheduler.remove(key)
+            for key in rows.keys() - self._jobs.keys():
+                self._jobs.add(JobRecord.from_store(*key, rows[key]))
+                self._scheduler.schedule(key, now)
+
+    def _persist(self, record: JobRecord, create: bool = False) -> bool:
+        """
+        Write a job's durable fields to the store. Caller must hold `self._lock`.
+        Only `create` inserts, so a job unbound by another worker isn't brought back,
+        and it never overwrites one that is already stored. Returns whether it wrote.
+        """
+        if create:
+            return self._store.insert(record.server, record.job_id, record.to_store())
+        return self._store.update(record.server, record.job_id, record.to_store())
 
     def start(self):
-        """Start the background monitoring thread."""
+        """Start the background monitoring task on the running event loop."""
         if self._running:
             return
         self._running = True
-        self._thread = threading.Thread(target=self._loop, daemon=True)
-        self._thread.start()
+        self._semaphore = asyncio.Semaphore(self.settings.MONITOR_MAX_WORKERS)
+        self._task = asyncio.get_running_loop().create_task(self._loop())
         print("✅ Job Monitor started.")
 
-    def stop(self):
-        """Stop the background monitoring thread."""
+    async def stop(self):
+        """Stop the background monitoring task, cancel in-flight polls and hand over the lease."""
         self._running = False
-        if self._thread:
-            self._thread.join()
+        tasks = [t for t in (self._task, *self._inflight.values(), *self._report_tasks) if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._inflight.clear()
+        if self._leader:
+            self._lease.release()
+            self._leader = False
 
-    def bind_job(self, server: str, job_id: str):
-        """Add a job to the monitoring list."""
+    def bind_job(self, server: str, job_id: str) -> bool:
+        """
+        Add a job to the monitoring list. Returns False, keeping its log position
+        and last reported steps, if it is already monitored (possibly through another worker).
+        """
         with self._lock:
-            key = (server, job_id)
-            self._jobs[key] = {
-                "last_epoch": -1
-            }
+            record = JobRecord(server, job_id)
+            if record.key in self._jobs or not self._persist(record, create=True):
+                return False
+            self._jobs.add(record)
+            # Followers don't poll; the leader picks the binding up from the store
+            if self._leader:
+                self._scheduler.schedule(record.key, time.monotonic())
         print(f"✅ Monitoring started for Job {job_id} on {server}")
+        return True
 
     def unbind_job(self, server: str, job_id: str) -> bool:
         """Remove a job from the monitoring list."""
         with self._lock:
             key = (server, job_id)
-            if key in self._jobs:
-                del self._jobs[key]
-                print(f"❌ Monitoring stopped for Job {job_id} on {server}")
-                return True
+            known = self._jobs.remove(key) is not None
+            self._scheduler.remove(key)
+        # The job may have been bound through another worker
+        if self._store.delete(server, job_id) or known:
+            print(f"❌ Monitoring stopped for Job {job_id} on {server}")
+            return True
         return False
 
-    def list_jobs(self) -> Dict[str, list]:
-        """List all currently monitored jobs grouped by server."""
+    def set_auto_bind(self, server: str, enabled: bool):
+        """Bind (or stop binding) every job that shows up in the queue on `server` from now on."""
         with self._lock:
-            result = {}
-            for (server, job_id), data in self._jobs.items():
-                if server not in result:
-                    result[server] = []
-                result[server].append({
-                    "job_id": job_id,
-                    "status": data.get("status", "Unknown"),
-                    "last_epoch": data.get("last_epoch", -1)
-                })
-        return result
-
-    def _loop(self):
+            if enabled:
+                self._auto_bind.add(server)
+            else:
+                self._auto_bind.discard(server)
+                self._watch_due.pop(server, None)
+            self._store.set_auto_bind(server, enabled)
+
+    def auto_bind_servers(self) -> List[str]:
+        self._sync()
+        with self._lock:
+            return sorted(self._auto_bind)
+
+    @property
+    def job_count(self) -> int:
+        return len(self._jobs)
+
+    def list_jobs(self) -> JobsByServer:
+        """
+        All currently monitored jobs grouped by server. Served from the table's
+        snapshot, so unless a job changed since the last call this takes no lock.
+        """
+        self._sync()
+        snapshot = self._jobs.cached_snapshot()
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._jobs.snapshot()
+        return snapshot
+
+    def jobs_on(self, server: str) -> Tuple[JobView, ...]:
+        return self.list_jobs().get(server, ())
+
+    async def _loop(self):
         while self._running:
             try:
-                self._check_all_jobs()
+                await self._renew_lease()
+                self._sync()
+                if self._leader:
+                    with MONITOR_TICK_SECONDS.time():
+                        self._check_all_jobs()
             except Exception as e:
                 print(f"⚠️ Error in monitoring loop: {e}")
-            
-            for _ in range(30):
-                if not self._running:
-                    break
-                time.sleep(1)
+
+            # Wake up for the next due job, but at least once a second for new bindings
+            # (followers only check the lease and the store, once a second)
+            with self._lock:
+                next_due = self._scheduler.next_due() if self._leader else None
+            delay = 1.0 if next_due is None else next_due - time.monotonic()
+            await asyncio.sleep(min(max(delay, 0.05), 1.0))
+
+    async def _renew_lease(self):
+        """Acquire or renew the monitor lease every third of its TTL; start or stop polling accordingly."""
+        now = time.monotonic()
+        if now < self._lease_renew_at:
+            return
+        self._lease_renew_at = now + self.settings.MONITOR_LEASE_TTL / 3
+
+        leader = self._lease.try_acquire()
+        if leader and not self._leader:
+            self._leader = True
+            print("👑 This worker now runs the job monitor.")
+            self._restore()
+        elif not leader and self._leader:
+            self._leader = False
+            print("⚠️ Lost the monitor lease; another worker runs the job monitor now.")
+            tasks = list(self._inflight.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._inflight.clear()
 
     def _check_all_jobs(self):
+        """
+        Dispatch a poll for every server that has due jobs, or whose queue is
+        watched for new jobs. Each server runs as its own task, so a hung server
+        only delays its own jobs.
+        """
+        now = time.monotonic()
         with self._lock:
-            keys = list(self._jobs.keys())
+            # Jobs due shortly ride along with a server poll that happens anyway
+            candidates = self._scheduler.pop_due(now + self.settings.MONITOR_BATCH_WINDOW)
+            servers_due = {server for (server, _), due in candidates if due <= now}
+            for server in self._auto_bind:
+                task = self._inflight.get(server)
+                if self._watch_due.get(server, 0) <= now and not (task and not task.done()):
+                    servers_due.add(server)
 
-        for server, job_id in keys:
-            if not self._running:
-                break
-            
-            self._process_job(server, job_id)
+            jobs_by_server: Dict[str, List[str]] = {}
+            for (server, job_id), due in candidates:
+                task = self._inflight.get(server)
+                if server not in servers_due:
+                    self._scheduler.schedule((server, job_id), due)
+                elif task and not task.done():
+                    # Picked up once the running poll of this server has finished
+                    self._scheduler.schedule((server, job_id), max(due, now + 1))
+                else:
+                    jobs_by_server.setdefault(server, []).append(job_id)
+            for server in servers_due:
+                jobs_by_server.setdefault(server, [])
+
+        for server, job_ids in jobs_by_server.items():
+            self._inflight[server] = asyncio.create_task(self._poll_server_safe(server, job_ids))
+
+    async def _poll_server_safe(self, server: str, job_ids: List[str]):
+        reachable = False
+        started = time.perf_counter()
+        label = server_label(server)
+        MONITOR_JOBS_PER_POLL.observe(len(job_ids), server=label)
+        MONITOR_JOBS_POLLED.inc(len(job_ids), server=label)
+        try:
+            async with self._semaphore:
+                reachable = await asyncio.wait_for(
+                    self._poll_server(server, job_ids),
+                    timeout=self.settings.MONITOR_SERVER_TIMEOUT
+                )
+        except asyncio.TimeoutError:
+            print(f"⚠️ Poll deadline reached for {server}, backing off.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error while polling {server}: {e}")
+
+        MONITOR_POLL_SECONDS.observe(time.perf_counter() - started, server=label)
+        self._reschedule(server, job_ids, reachable)
+
+    def _reschedule(self, server: str, job_ids: List[str], reachable: bool):
+        """Give every polled job that is still bound its next due time."""
+        if reachable:
+            self._server_failures.pop(server, None)
+        else:
+            self._server_failures[server] = self._server_failures.get(server, 0) + 1
+
+        now = time.monotonic()
+        with self._lock:
+            if server in self._auto_bind:
+                failures = self._server_failures.get(server, 0)
+                self._watch_due[server] = now + min(
+                    self.settings.MONITOR_POLL_INTERVAL * 2 ** failures, self.settings.MONITOR_MAX_INTERVAL
+                )
+            for job_id in job_ids:
+                key = (server, job_id)
+                record = self._jobs.get(key)
+                if record is None or key in self._scheduler:
+                    continue
+
+                if reachable:
+                    delay = self._next_interval(record)
+                else:
+                    # Exponential backoff for the whole server while it's unreachable
+                    failures = self._server_failures[server]
+                    delay = min(self.settings.MONITOR_POLL_INTERVAL * 2 ** failures, self.settings.MONITOR_MAX_INTERVAL)
+                self._scheduler.schedule(key, now + delay)
 
-    def _process_job(self, server: str, job_id: str):
-        squeue_cmd = f"{self.settings.SLURM_CMD_SQUEUE} --job {job_id} --noheader --format=%t"
-        status_output = execute_remote_command(server, squeue_cmd).strip()
+    def _next_interval(self, record: JobRecord) -> float:
+        """
+        Poll interval for a job based on its state. Caller must hold `self._lock`.
+          - Pending: grows with time spent pending, so long-queued jobs are polled rarely.
+          - Running: drops to MONITOR_MIN_INTERVAL after a state change or new metrics,
+            then relaxes by 1.5x per quiet poll up to 4x MONITOR_POLL_INTERVAL.
+        """
+        base = self.settings.MONITOR_POLL_INTERVAL
+
+        if "PD" in record.status:
+            pending_for = time.time() - (record.pending_since or time.time())
+            return min(max(base, pending_for / 10), self.settings.MONITOR_MAX_INTERVAL)
+
+        if record.activity:
+            record.activity = False
+            interval = self.settings.MONITOR_MIN_INTERVAL
+        else:
+            interval = min((record.poll_interval or base) * 1.5, base * 4)
+        record.poll_interval = interval
+        return interval
+
+    async def _poll_server(self, server: str, job_ids: List[str]) -> bool:
+        """
+        Refresh the snapshot of the user's queue on `server` (one squeue call, which
+        also publishes job events) and check the given jobs against it.
+        Returns whether the server could be reached.
+        """
+        snapshot = await cluster_state.refresh(server)
+        if snapshot is None:
+            print(f"⚠️ Skipping check for {server}: {cluster_state.last_error(server)}")
+            return False
 
-        if "Connection Dead" in status_output or "Network is unreachable" in status_output:
-             print(f"⚠️ Skipping check for {server} due to connection issue.")
-             return
+        running = [job_id for job_id in job_ids if self._update_status(server, job_id, snapshot.get(job_id))]
+        if running:
+            # New output of all running jobs in a few round trips, not one ssh session per job
+            new_lines = await self._fetch_new_log_lines(server, running)
+            for job_id, lines in new_lines.items():
+                self._process_log_lines(server, job_id, lines)
+        return True
 
-        if not status_output or "Invalid job id" in status_output:
-            self.unbind_job(server, job_id)
-            self._notify_slack(server, job_id, "Job finished or disappeared. Unbinding.")
+    def _on_cluster_event(self, event: JobEvent):
+        """Notify about bound jobs and auto-bind new ones. Only the leader acts on events."""
+        if not self._leader:
             return
 
-        # Track status changes (specifically PD -> R)
+        server, job = event.server, event.job
         with self._lock:
-            if (server, job_id) in self._jobs:
-                job_data = self._jobs[(server, job_id)]
-                last_status = job_data.get("status")
-                
-                # Update status
-                job_data["status"] = status_output
-                
-                # Check for transition from PD to R
-                if last_status and "PD" in last_status and "R" in status_output:
-                    self._notify_slack(server, job_id, "🚀 Job transitioned from Pending (PD) to Running (R).")
-
-        if "PD" in status_output:
-            return 
-        
-        if "R" not in status_output and "CG" not in status_output:
-            if "R" not in status_output: 
-                 return 
-
-        show_cmd = f"show {job_id} | tail -n 20"
-        log_output = execute_remote_command(server, show_cmd)
-
-        parsed_data = self._parse_accuracy(log_output)
-
-        if parsed_data:
-            new_epoch, experiment_name, new_accuracy = parsed_data
-            
+            bound = (server, job.job_id) in self._jobs
+            auto_bind = server in self._auto_bind
+
+        if event.kind in (EventKind.SUBMITTED, EventKind.APPEARED):
+            if auto_bind and not bound and job.state in ACTIVE_STATES and self.bind_job(server, job.job_id):
+                self._notify_slack(server, job.job_id, f"🆕 New job `{job.name}` [{job.state}] picked up automatically.")
+            return
+
+        if not bound:
+            return
+
+        if event.kind == EventKind.STARTED:
+            self._notify_slack(server, job.job_id, "🚀 Job transitioned from Pending (PD) to Running (R).")
+        elif event.kind == EventKind.REQUEUED:
+            self._notify_slack(server, job.job_id, f"🔁 Job was requeued ({job.reason or job.state}).")
+        else:
+            # Used when accounting has nothing on the job
+            messages = {
+                EventKind.COMPLETED: "✅ Job completed.",
+                EventKind.FAILED: f"❌ Job ended with state `{job.state}`{f' ({job.reason})' if job.reason and job.reason != 'None' else ''}.",
+                EventKind.CANCELLED: "🛑 Job was cancelled.",
+                EventKind.PREEMPTED: "⚠️ Job was preempted.",
+                EventKind.DISAPPEARED: "Job finished or disappeared.",
+            }
+            self.unbind_job(server, job.job_id)
+            self._report_finished(server, job.job_id, messages[event.kind])
+
+    def _report_finished(self, server: str, job_id: str, fallback: str):
+        """Queue the final notification of a job; jobs of one server are looked up in sacct together."""
+        pending = self._finished.setdefault(server, [])
+        pending.append((job_id, fallback))
+        if len(pending) == 1:
+            task = asyncio.get_running_loop().create_task(self._send_final_reports(server))
+            self._report_tasks.add(task)
+            task.add_done_callback(self._report_tasks.discard)
+
+    async def _send_final_reports(self, server: str):
+        # Let the other jobs that finished in the same poll join the batch
+        await asyncio.sleep(0.2)
+        batch = self._finished.pop(server, [])
+        summaries = await accounting.summarize(server, [job_id for job_id, _ in batch])
+        for job_id, fallback in batch:
+            summary = summaries.get(job_id)
+            text = describe(summary) if summary else fallback
+            self._notify_slack(server, job_id, f"{text}\nUnbinding.")
+
+    def _update_status(self, server: str, job_id: str, job: Optional[QueuedJob]) -> bool:
+        """Record the job's state from the queue snapshot; returns whether its log should be read."""
+        if job is None or job.state not in ACTIVE_STATES:
+            # Normally reported by an event; this catches jobs that ended before the first snapshot
+            if self.unbind_job(server, job_id):
+                self._report_finished(server, job_id, "Job finished or disappeared.")
+            return False
+
+        status = job.state
+        with self._lock:
+            record = self._jobs.get((server, job_id))
+            if record is None:
+                return False
+            if status != record.status:
+                self._jobs.set_status(record, status)
+                record.activity = True
+                if status == "PD":
+                    record.pending_since = time.time()
+                self._persist(record)
+
+        return status in ("R", "CG")
+
+    def _process_log_lines(self, server: str, job_id: str, log_lines: List[str]):
+        if not log_lines:
+            return
+
+        with METRIC_PARSE_SECONDS.time():
+            records = self._extractor.extract("\n".join(log_lines))
+
+        with self._lock:
+            job_record = self._jobs.get((server, job_id))
+            if job_record is None:
+                return
+
+            if job_record.last_steps is None:
+                job_record.last_steps = {}
+            last_steps = job_record.last_steps
+            new_records = [r for r in records if r.step > last_steps.get(r.name, -1)]
+            for record in new_records:
+                last_steps[record.name] = max(record.step, last_steps.get(record.name, -1))
+            if new_records:
+                job_record.last_epoch = max(job_record.last_epoch, max(r.step for r in new_records))
+                job_record.activity = True
+                self._jobs.touch()
+                self._persist(job_record)
+
+        if new_records:
+            self._record_history(server, job_id, new_records)
+            self._notify_slack(server, job_id, self._format_records(new_records))
+
+    async def _fetch_new_log_lines(self, server: str, job_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Fetch only the log output each job wrote since the last poll, for all
+        of them in one remote script per LOG_BATCH_SIZE jobs.
+        Tracks a per-job (inode, byte offset) into the job's StdOut file and keeps
+        the trailing partial line until it is completed. Falls back to the last
+        20 lines of `show` when the output file can't be resolved.
+        """
+        with self._lock:
+            unresolved = [
+                job_id for job_id in job_ids
+                if (record := self._jobs.get((server, job_id))) is not None and record.log_path is None
+            ]
+        if unresolved:
+            await self._resolve_log_paths(server, unresolved)
+
+        commands: List[Tuple[str, str]] = []
+        offsets: Dict[str, int] = {}
+        with self._lock:
+            for job_id in job_ids:
+                record = self._jobs.get((server, job_id))
+                if record is None or record.log_path is None:
+                    continue
+                if record.log_path:
+                    commands.append((job_id, build_tail_command(
+                        record.log_path, record.log_inode, record.log_offset, self.settings.MONITOR_LOG_MAX_BYTES
+                    )))
+                    offsets[job_id] = record.log_offset
+                else:
+                    commands.append((job_id, build_show_tail_command(job_id)))
+
+        lines: Dict[str, List[str]] = {}
+        for start in range(0, len(commands), LOG_BATCH_SIZE):
+            batch = commands[start:start + LOG_BATCH_SIZE]
+            # The output is the jobs' own logs, so only the outcome says whether the server answered
+            result = await run_remote_command(server, build_batch_command(batch), kind="log_tail")
+            if not result.reachable:
+                break
+            sections = split_batch_output(result.text)
+            for job_id, _ in batch:
+                section = sections.get(job_id)
+                if section is None:
+                    continue
+                if job_id in offsets:
+                    chunk = parse_tail_output(section)
+                    if chunk is not None:
+                        lines[job_id] = self._consume_chunk(server, job_id, offsets[job_id], chunk)
+                else:
+                    lines[job_id] = section.splitlines()
+        return lines
+
+    async def _resolve_log_paths(self, server: str, job_ids: List[str]):
+        """Look up the output file of jobs with `scontrol`, all in one remote call; "" marks one that can't be read."""
+        for start in range(0, len(job_ids), LOG_BATCH_SIZE):
+            batch = job_ids[start:start + LOG_BATCH_SIZE]
+            result = await run_remote_command(
+                server, build_batch_command([(job_id, build_stdout_path_command(job_id)) for job_id in batch]),
+                kind="scontrol"
+            )
+            if not result.reachable:
+                return
+            sections = split_batch_output(result.text)
             with self._lock:
-                key = (server, job_id)
-                if key not in self._jobs:
-                    return
-                    
-                last_epoch = self._jobs[key].get("last_epoch", -1)
-                
-                if int(new_epoch) > int(last_epoch):
-                    self._jobs[key]["last_epoch"] = int(new_epoch)
-                    self._notify_slack(
-                        server, 
-                        job_id, 
-                        f"📈 Epoch {new_epoch}: Accuracy *{new_accuracy}*\n🧪 Experiment: `{experiment_name}`"
-                    )
-
-    def _parse_accuracy(self, log_output: str) -> Optional[Tuple[str, str, str]]:
-        """
-        Parse validation accuracy and experiment name from log output.
-        Returns (epoch, accuracy, experiment_name) or None.
-        """
-        pattern = r"Epoch:\s+(\d+)\s+\|\s+Experiment:\s+(.+?)\s+\|\s+Validation Accuracy:\s+([\d\.]+)"
-        matches = re.findall(pattern, log_output)
-        
-        if not matches:
-            return None
-            
-        return matches[-1]
+                for job_id in batch:
+                    record = self._jobs.get((server, job_id))
+                    if record is not None and job_id in sections:
+                        record.log_path = parse_stdout_path(sections[job_id]) or ""
+                        self._persist(record)
+
+    def _consume_chunk(self, server: str, job_id: str, offset: int, chunk: TailChunk) -> List[str]:
+        """Advance the job's log position past `chunk` and return the lines it completes."""
+        with self._lock:
+            record = self._jobs.get((server, job_id))
+            if record is None:
+                return []
+            if record.log_buffer is None:
+                record.log_buffer = LineBuffer()
+            buffer = record.log_buffer
+            if chunk.offset != offset:
+                # The file was replaced or truncated; drop the stale partial line
+                buffer.reset()
+            record.log_inode = chunk.inode
+            record.log_offset = chunk.end_offset
+            lines = buffer.feed(chunk.data)
+            if chunk.length:
+                self._persist(record)
+            return lines
+
+    def _record_history(self, server: str, job_id: str, records: List[MetricRecord]):
+        try:
+            metric_history.append(server, job_id, records)
+        except OSError as e:
+            print(f"⚠️ Could not record metric history of Job {job_id} on {server}: {e}")
+
+    def _format_records(self, records: List[MetricRecord], limit: int = 10) -> str:
+        lines = [
+            f"📈 {self._extractor.step_label(r.name)} {r.step}: {r.name} *{r.value:g}*"
+            for r in records[-limit:]
+        ]
+        if len(records) > limit:
+            lines.insert(0, f"… {len(records) - limit} earlier results omitted")
+
+        experiment = records[-1].experiment
+        if experiment:
+            lines.append(f"🧪 Experiment: `{experiment}`")
+        return "\n".join(lines)
 
     def _notify_slack(self, server: str, job_id: str, message: str):
         # Always use the configured fixed channel
         channel_id = self.settings.SLACK_LOG_CHANNEL_ID
         text = f"[{server}] Job {job_id}:\n{message}"
 
-        url = "https://slack.com/api/chat.postMessage"
-        headers = {
-            "Authorization": f"Bearer {self.settings.SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "channel": channel_id,
-            "text": text
-        }
-
-        try:
-            with httpx.Client() as client:
-                resp = client.post(url, headers=headers, json=payload)
-                resp.raise_for_status()
-        except Exception as e:
-            print(f"❌ Failed to send Slack notification: {e}")
+        # Queued: updates from the same tick are coalesced and rate limits are honoured
+        slack_client.post_message(channel_id, text)
 
-monitor_service = JobMonitor()
+# Built on first use, so importing the module doesn't open the store or read settings
+monitor_service: JobMonitor = Lazy(JobMonitor)
@@ -0,0 +1,65 @@
+from typing import List, NamedTuple, Optional, Tuple
+from .dashboard import ClusterDashboard, PartitionUsage
+
+# Weights of the placement score; each term is scaled to 0-1
+AVAILABILITY_WEIGHT = 0.5  # Share of the partition's GPUs that are idle
+FAIRSHARE_WEIGHT = 0.3  # Our FairShare factor; higher means our jobs get priority sooner
+QUEUE_WEIGHT = 0.2  # Pending jobs relative to the partition's size
+OWN_QUEUE_WEIGHT = 0.1  # Our own pending jobs there, so submissions don't pile up on one server
+NEUTRAL_FAIRSHARE = 0.5  # Used when sshare reported nothing
+
+class ServerScore(NamedTuple):
+    server: str
+    score: float
+    partition: Optional[PartitionUsage]  # Partition the job would be submitted to; None if it couldn't be read
+    fairshare: Optional[float]
+    error: str = ""
+
+    def describe(self) -> str:
+        if self.partition is None:
+            return f"`{self.server}` ({self.error or 'no data'})"
+        p = self.partition
+        share = f"{self.fairshare:.2f}" if self.fairshare is not None else "n/a"
+        return (
+            f"`{self.server}` {self.score:.2f}: {p.gpus_idle}/{p.gpus} GPUs idle in `{p.partition}`, "
+            f"{p.pending} pending ({p.mine_pending} ours), fairshare {share}"
+        )
+
+def _target_partition(rows: List[PartitionUsage], partition: Optional[str]) -> Tuple[Optional[PartitionUsage], str]:
+    """The partition a submission will land in: the one it names, else the server's default. Or why there is none."""
+    if partition:
+        match = next((r for r in rows if r.partition == partition), None)
+        return match, "" if match else f"no partition `{partition}`"
+    match = next((r for r in rows if r.default), None)
+    return match, "" if match else "no default partition; pass `partition=`"
+
+def score_partition(partition: PartitionUsage, fairshare: Optional[float]) -> float:
+    availability = partition.gpus_idle / partition.gpus if partition.gpus else 0.0
+    pressure = partition.pending / (partition.pending + max(partition.gpus, partition.nodes_up, 1))
+    own = partition.mine_pending / (partition.mine_pending + 1)
+    share = NEUTRAL_FAIRSHARE if fairshare is None else min(max(fairshare, 0.0), 1.0)
+    return (
+        AVAILABILITY_WEIGHT * availability
+        + FAIRSHARE_WEIGHT * share
+        - QUEUE_WEIGHT * pressure
+        - OWN_QUEUE_WEIGHT * own
+    )
+
+def rank_servers(dashboard: ClusterDashboard, servers: List[str], partition: Optional[str] = None) -> List[ServerScore]:
+    """
+    Servers ordered from best to worst place to submit, from the dashboard snapshot.
+    Each is scored on the partition the job would run in (`partition`, or the
+    server's default); servers without it or that couldn't be read come last.
+    """
+    errors = dashboard.errors()
+    scores = []
+    for server in servers:
+        rows = dashboard.rows(server)
+        target, missing = _target_partition(rows, partition)
+        fairshare = dashboard.fairshare(server)
+        if target is None:
+            error = errors.get(server, "") if not rows else missing
+            scores.append(ServerScore(server, float("-inf"), None, fairshare, error))
+        else:
+            scores.append(ServerScore(server, score_partition(target, fairshare), target, fairshare))
+    return sorted(scores, key=lambda s: s.score, reverse=True)
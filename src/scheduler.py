@@ -0,0 +1,48 @@
+import heapq
+import itertools
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class PollScheduler:
+    """
+    Priority queue of keys ordered by the time they are next due.
+
+    Rescheduling or removing a key doesn't touch the heap; stale heap entries
+    are skipped when they surface. A key popped by `pop_due` stays unscheduled
+    until the caller schedules it again.
+    """
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._due: Dict[Hashable, float] = {}
+        self._counter = itertools.count()
+
+    def schedule(self, key: Hashable, due: float):
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._counter), key))
+
+    def remove(self, key: Hashable):
+        self._due.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._due
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def pop_due(self, now: float) -> List[Tuple[Hashable, float]]:
+        """Remove and return every (key, due time) due at or before `now`, earliest first."""
+        due_items = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, key = heapq.heappop(self._heap)
+            if self._due.get(key) == due:
+                del self._due[key]
+                due_items.append((key, due))
+        return due_items
+
+    def next_due(self) -> Optional[float]:
+        """Time the earliest key is due, or None if nothing is scheduled."""
+        while self._heap:
+            due, _, key = self._heap[0]
+            if self._due.get(key) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
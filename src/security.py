@@ -1,29 +1,108 @@
 import hmac
 import hashlib
+import os
+import sqlite3
+import threading
 import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl
 from fastapi import Request, HTTPException, Header
-from .config import get_settings
+from .config import Lazy, settings
 
-settings = get_settings()
+MAX_REQUEST_AGE = 60 * 5  # Seconds a signed request stays valid
+REPLAY_BUSY_TIMEOUT = 0.1  # Seconds to wait on another worker's write; bounds the stall of the event loop
 
-async def verify_slack_signature(
+class ReplayCache:
+    """
+    Signatures of requests already accepted, so one can't be sent twice.
+
+    Kept in a SQLite file shared by every worker, so a replay is caught whichever
+    worker it reaches. An entry only needs to live as long as its timestamp is
+    accepted; expired ones are purged at most every `purge_interval` seconds.
+    `add` runs on the event loop: a write takes microseconds, cheaper than a thread
+    hop, and one waiting on another worker gives up after `busy_timeout` seconds.
+    """
+    def __init__(self, path: str, purge_interval: float = 60, busy_timeout: float = REPLAY_BUSY_TIMEOUT):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.purge_interval = purge_interval
+        self._purge_at = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=busy_timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few entries in a power cut is fine; an fsync per request is not
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_requests (
+                signature BLOB PRIMARY KEY,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def add(self, signature: bytes, timestamp: float, now: float) -> bool:
+        """Record `signature`; False if it was already seen, by this worker or another."""
+        with self._lock:
+            if now >= self._purge_at:
+                self._conn.execute("DELETE FROM seen_requests WHERE expires_at < ?", (now,))
+                self._purge_at = now + self.purge_interval
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO seen_requests (signature, expires_at) VALUES (?, ?)",
+                (signature, timestamp + MAX_REQUEST_AGE)
+            )
+            return cursor.rowcount == 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_replay_cache: ReplayCache = Lazy(lambda: ReplayCache(settings.LEASE_DB_PATH))
+_signer: Optional["hmac.HMAC"] = None
+
+def _new_signer() -> "hmac.HMAC":
+    """HMAC keyed with the signing secret; copying it skips re-deriving the key per request."""
+    global _signer
+    if _signer is None:
+        _signer = hmac.new(settings.SLACK_SIGNING_SECRET.encode(), digestmod=hashlib.sha256)
+    return _signer.copy()
+
+async def verify_slack_request(
     request: Request,
     x_slack_signature: str = Header(...),
     x_slack_request_timestamp: str = Header(...)
-):
-    if abs(time.time() - int(x_slack_request_timestamp)) > 60 * 5:
-        raise HTTPException(status_code=400, detail="Request timestamp expired")
-
-    body_bytes = await request.body()
-    body_text = body_bytes.decode()
+) -> Dict[str, str]:
+    """
+    Check a slash command's signature and return its form fields.
 
-    sig_basestring = f"v0:{x_slack_request_timestamp}:{body_text}"
+    The raw body is read once, signed as is, and parsed once; replayed
+    requests are rejected even while their timestamp is still valid.
+    """
+    now = time.time()
+    try:
+        timestamp = int(x_slack_request_timestamp)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid request timestamp")
+    if abs(now - timestamp) > MAX_REQUEST_AGE:
+        raise HTTPException(status_code=400, detail="Request timestamp expired")
 
-    my_signature = "v0=" + hmac.new(
-        settings.SLACK_SIGNING_SECRET.encode(),
-        sig_basestring.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    body = await request.body()
+    signer = _new_signer()
+    signer.update(b"v0:%s:" % x_slack_request_timestamp.encode())
+    signer.update(body)
+    signature = x_slack_signature.encode()
 
-    if not hmac.compare_digest(my_signature, x_slack_signature):
+    if not hmac.compare_digest(b"v0=" + signer.hexdigest().encode(), signature):
         raise HTTPException(status_code=403, detail="Invalid Slack signature")
+    try:
+        fresh = _replay_cache.add(signature, timestamp, now)
+    except sqlite3.OperationalError as e:
+        # Can't tell whether it's a replay, so don't run it
+        print(f"⚠️ Could not check for a replayed request: {e}")
+        raise HTTPException(status_code=503, detail="Try again")
+    if not fresh:
+        raise HTTPException(status_code=400, detail="Replayed request")
+
+    return dict(parse_qsl(body.decode(), keep_blank_values=True))
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+import httpx
+from .config import Lazy, settings
+from .metrics import SLACK_POST_FAILURES, SLACK_POST_SECONDS, SLACK_RATE_LIMITED
+
+POST_MESSAGE_URL = "https://slack.com/api/chat.postMessage"
+MAX_MESSAGE_CHARS = 3500  # Stay well below Slack's limit when coalescing
+
+class SlackClient:
+    """
+    Long-lived Slack client shared by the monitor and the command runners.
+
+    One pooled `httpx.AsyncClient` keeps TLS connections alive between messages.
+    Channel messages go through a per-channel queue drained by one worker each:
+    the worker waits out `Retry-After` on HTTP 429 and joins messages queued within
+    the same short window into a single `chat.postMessage`.
+    """
+    def __init__(self, coalesce_window: float = 1.0, min_interval: float = 1.0, max_retries: int = 3):
+        self.coalesce_window = coalesce_window
+        self.min_interval = min_interval  # Slack allows about one message per second per channel
+        self.max_retries = max_retries
+        self._client: Optional[httpx.AsyncClient] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return self._client
+
+    async def close(self):
+        """Flush queued messages, then close the connection pool."""
+        for queue in self._queues.values():
+            await queue.join()
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def post_message(self, channel: str, text: str):
+        """Queue `text` for `channel`. Returns immediately; delivery happens in the background."""
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = asyncio.Queue()
+            self._workers[channel] = asyncio.create_task(self._channel_worker(channel, queue))
+        queue.put_nowait(text)
+
+    async def post_response(self, response_url: str, payload: dict) -> bool:
+        """Post to a slash command `response_url`, retrying on 429."""
+        return await self._post(response_url, payload)
+
+    async def _channel_worker(self, channel: str, queue: asyncio.Queue):
+        last_post = 0.0
+        while True:
+            texts = [await queue.get()]
+
+            # Give the rest of this burst (e.g. one monitor tick) a moment to arrive
+            deadline = time.monotonic() + self.coalesce_window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    texts.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                for text in self._coalesce(texts):
+                    wait = last_post + self.min_interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    last_post = time.monotonic()
+                    await self._post(
+                        POST_MESSAGE_URL,
+                        {"channel": channel, "text": text},
+                        headers={"Authorization": f"Bearer {settings.SLACK_BOT_TOKEN}"}
+                    )
+            finally:
+                for _ in texts:
+                    queue.task_done()
+
+    def _coalesce(self, texts: List[str]) -> List[str]:
+        """Join texts into as few messages as fit in `MAX_MESSAGE_CHARS`."""
+        messages: List[str] = []
+        for text in texts:
+            if messages and len(messages[-1]) + len(text) + 2 <= MAX_MESSAGE_CHARS:
+                messages[-1] += f"\n\n{text}"
+            else:
+                messages.append(text)
+        return messages
+
+    def queue_depth(self) -> int:
+        """Channel messages waiting to be posted."""
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    async def _post(self, url: str, payload: dict, headers: Optional[dict] = None) -> bool:
+        kind = "message" if url == POST_MESSAGE_URL else "response"
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                resp = await self.client.post(url, json=payload, headers=headers)
+            except httpx.HTTPError as e:
+                print(f"❌ Failed to send Slack message: {e}")
+                SLACK_POST_FAILURES.inc(kind=kind, reason="network")
+                return False
+            SLACK_POST_SECONDS.observe(time.perf_counter() - started, kind=kind)
+
+            if resp.status_code == 429:
+                SLACK_RATE_LIMITED.inc(kind=kind)
+                if attempt < self.max_retries:
+                    retry_after = float(resp.headers.get("Retry-After", 1))
+                    print(f"⏳ Slack rate limited, retrying in {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+
+            if resp.status_code >= 400:
+                print(f"❌ Failed to send Slack message: HTTP {resp.status_code}")
+                SLACK_POST_FAILURES.inc(kind=kind, reason="rate_limited" if resp.status_code == 429 else "http_error")
+                return False
+
+            if kind == "message":
+                try:
+                    body = resp.json()
+                except ValueError:
+                    body = {"ok": False, "error": "invalid JSON response"}
+                if not body.get("ok"):
+                    print(f"❌ Failed to send Slack message: {body.get('error')}")
+                    SLACK_POST_FAILURES.inc(kind=kind, reason="api_error")
+                    return False
+            return True
+        return False
+
+slack_client: SlackClient = Lazy(lambda: SlackClient(coalesce_window=settings.SLACK_COALESCE_WINDOW))
@@ -1,42 +1,440 @@
-import subprocess
-from .config import get_settings
+import asyncio
+import codecs
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .cache import ResultCache
+from .config import Lazy, settings
+from .metrics import SSH_COMMAND_SECONDS, SSH_COMMANDS
 
-settings = get_settings()
+SOCKET_DIR = "/tmp/ssh_mux"
+CONNECTION_DEAD_MESSAGE = "❌ Connection Dead. Please re-authenticate on the Oracle Server."
+TIMEOUT_MESSAGE = "❌ Command Timed Out."
+SSH_ERROR_EXIT_CODE = 255  # ssh's exit code when it failed itself, e.g. a dead ControlMaster
 
-def execute_remote_command(server: str, cmd_string: str) -> str:
-    SOCKET_PATH = f"/tmp/ssh_mux/{server}"
-    
+class Outcome(str, Enum):
+    OK = "ok"
+    ERROR = "error"  # The remote command ran and exited non-zero
+    TIMEOUT = "timeout"
+    DEAD = "dead"  # ssh couldn't reach the server
+    SYSTEM_ERROR = "system_error"  # ssh couldn't be run locally
+
+class RemoteResult(NamedTuple):
+    outcome: Outcome
+    text: str  # What the command printed, or the message shown to users for a failure
+    returncode: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == Outcome.OK
+
+    @property
+    def reachable(self) -> bool:
+        """Whether the command ran on the server, whatever its exit code."""
+        return self.outcome in (Outcome.OK, Outcome.ERROR)
+
+_TIMEOUT = RemoteResult(Outcome.TIMEOUT, TIMEOUT_MESSAGE)
+_DEAD = RemoteResult(Outcome.DEAD, CONNECTION_DEAD_MESSAGE)
+
+def _system_error(e: Exception) -> RemoteResult:
+    return RemoteResult(Outcome.SYSTEM_ERROR, f"❌ System Error: {str(e)}")
+
+def is_configured_server(server: str) -> bool:
+    return server in settings.server_names
+
+def server_label(server: str) -> str:
+    """Metric label for a server; anything outside SSH_SERVERS shares one, to keep label sets bounded."""
+    return server if is_configured_server(server) else "unknown"
+
+def _ssh_target(server: str) -> str:
+    return f"{settings.SSH_USER}@{server}.{settings.SSH_HOST}"
+
+class HealthState(str, Enum):
+    UNKNOWN = "unknown"
+    HEALTHY = "healthy"
+    DEAD = "dead"
+
+@dataclass
+class ServerHealth:
+    server: str
+    state: HealthState = HealthState.UNKNOWN
+    last_ok: Optional[float] = None  # Wall-clock time of the last successful contact
+    last_checked: Optional[float] = None  # Monotonic time of the last contact attempt
+    last_error: str = ""
+    consecutive_failures: int = 0
+
+class ConnectionManager:
+    """
+    Tracks the health of the long-lived ControlMaster session of every server.
+
+    The sessions themselves are owned by the host (mounted under `SOCKET_DIR`);
+    this class keeps them warm with cheap `ssh -O check` keepalives and remembers
+    which servers are dead, so commands to them fail instantly instead of
+    waiting for the ssh timeout.
+    """
+    def __init__(self, keepalive_interval: int, dead_retry_interval: int):
+        self.keepalive_interval = keepalive_interval
+        self.dead_retry_interval = dead_retry_interval
+        self._health: Dict[str, ServerHealth] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def socket_path(self, server: str) -> str:
+        return os.path.join(SOCKET_DIR, server)
+
+    def get_health(self, server: str) -> ServerHealth:
+        with self._lock:
+            health = self._health.get(server)
+            return replace(health) if health else ServerHealth(server)
+
+    def list_health(self) -> Dict[str, ServerHealth]:
+        with self._lock:
+            return {server: replace(h) for server, h in self._health.items()}
+
+    def is_known_dead(self, server: str) -> bool:
+        """A dead server is short-circuited until `dead_retry_interval` has passed since the last attempt."""
+        with self._lock:
+            health = self._health.get(server)
+            if not health or health.state != HealthState.DEAD:
+                return False
+            return time.monotonic() - health.last_checked < self.dead_retry_interval
+
+    def record_success(self, server: str):
+        if not is_configured_server(server):
+            return
+        with self._lock:
+            health = self._health.setdefault(server, ServerHealth(server))
+            if health.state == HealthState.DEAD:
+                print(f"✅ Connection to {server} restored.")
+            health.state = HealthState.HEALTHY
+            health.last_ok = time.time()
+            health.last_checked = time.monotonic()
+            health.last_error = ""
+            health.consecutive_failures = 0
+
+    def record_failure(self, server: str, error: str):
+        # Only servers in SSH_SERVERS are tracked, so a mistyped name can't add an entry for good
+        if not is_configured_server(server):
+            return
+        with self._lock:
+            health = self._health.setdefault(server, ServerHealth(server))
+            if health.state != HealthState.DEAD:
+                print(f"⚠️ Connection to {server} marked dead: {error}")
+            health.state = HealthState.DEAD
+            health.last_checked = time.monotonic()
+            health.last_error = error
+            health.consecutive_failures += 1
+
+    def precheck(self, server: str) -> bool:
+        """
+        Whether a command to `server` may run. Catches known-dead servers and
+        missing sockets without forking an ssh client.
+        """
+        if self.is_known_dead(server):
+            return False
+        if not os.path.exists(self.socket_path(server)):
+            self.record_failure(server, "ControlMaster socket missing")
+            return False
+        return True
+
+    def record_result(self, server: str, returncode: int, stderr: str):
+        """
+        Update health from a finished command. Only ssh's own exit code (255) means the
+        connection failed; anything else came from the remote command, whose stderr
+        (a missing file, a noisy login profile) says nothing about the session.
+        """
+        if returncode == SSH_ERROR_EXIT_CODE:
+            self.record_failure(server, stderr.strip() or f"ssh exited with {returncode}")
+        else:
+            self.record_success(server)
+
+    async def check(self, server: str) -> ServerHealth:
+        """Ask the ControlMaster whether its session is alive; doesn't open a new channel."""
+        if not os.path.exists(self.socket_path(server)):
+            self.record_failure(server, "ControlMaster socket missing")
+            return self.get_health(server)
+
+        cmd = ["ssh", "-S", self.socket_path(server), "-O", "check", _ssh_target(server)]
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout=5)
+            except asyncio.TimeoutError:
+                await _terminate(proc)
+                self.record_failure(server, "Keepalive timed out")
+                return self.get_health(server)
+        except Exception as e:
+            self.record_failure(server, str(e))
+            return self.get_health(server)
+
+        if proc.returncode == 0:
+            self.record_success(server)
+        else:
+            self.record_failure(server, stderr.decode(errors="replace").strip() or "Master not running")
+        return self.get_health(server)
+
+    def start(self):
+        """Start the keepalive task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._keepalive_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _keepalive_loop(self):
+        while True:
+            servers = set(settings.server_names)
+            with self._lock:
+                # Forget servers removed from SSH_SERVERS
+                for server in self._health.keys() - servers:
+                    del self._health[server]
+
+            await asyncio.gather(*(self.check(server) for server in servers), return_exceptions=True)
+            await asyncio.sleep(self.keepalive_interval)
+
+connection_manager: ConnectionManager = Lazy(lambda: ConnectionManager(
+    keepalive_interval=settings.SSH_KEEPALIVE_INTERVAL,
+    dead_retry_interval=settings.SSH_DEAD_RETRY_INTERVAL
+))
+
+# (server, command) -> (returncode, stdout, stderr); replaces ssh when set
+RemoteBackend = Callable[[str, str], Awaitable[Tuple[int, str, str]]]
+_backend: Optional[RemoteBackend] = None
+
+def set_backend(backend: Optional[RemoteBackend]):
+    """
+    Route remote commands and streams through `backend` instead of ssh,
+    e.g. to drive the bot against a simulated cluster. `None` restores ssh.
+    Health tracking, caching and metrics behave as with real servers.
+    """
+    global _backend
+    _backend = backend
+
+async def _execute_on_backend(server: str, cmd_string: str, timeout: float) -> RemoteResult:
+    if connection_manager.is_known_dead(server):
+        return _DEAD
+    try:
+        returncode, stdout, stderr = await asyncio.wait_for(_backend(server, cmd_string), timeout=timeout)
+    except asyncio.TimeoutError:
+        return _TIMEOUT
+    except Exception as e:
+        return _system_error(e)
+
+    connection_manager.record_result(server, returncode, stderr)
+    return _format_result(returncode, stdout, stderr)
+
+def _build_ssh_command(server: str, cmd_string: str) -> List[str]:
     final_command = f"bash -l -c '{cmd_string}'"
 
-    cmd = [
+    return [
         "ssh",
-        "-S", SOCKET_PATH,
+        "-S", connection_manager.socket_path(server),
         "-o", "BatchMode=yes",
         "-o", "StrictHostKeyChecking=no",
-        f"{settings.SSH_USER}@{server}.{settings.SSH_HOST}",
+        _ssh_target(server),
         final_command,
     ]
 
+def _command_kind(cmd_string: str) -> str:
+    """Low-cardinality label for a command: the program run after any `cd ... &&` prefix."""
+    token = cmd_string.rsplit("&&", 1)[-1].split(maxsplit=1)
+    token = token[0] if token else ""
+    if "=" in token:
+        return "shell"
+    return token.rsplit("/", 1)[-1] or "unknown"
+
+def _observe(server: str, cmd_string: str, started: float, outcome: Outcome, kind: Optional[str] = None):
+    label = server_label(server)
+    SSH_COMMANDS.inc(server=label, outcome="error" if outcome == Outcome.SYSTEM_ERROR else outcome.value)
+    SSH_COMMAND_SECONDS.observe(time.perf_counter() - started, server=label, command=kind or _command_kind(cmd_string))
+
+def _format_result(returncode: int, stdout: str, stderr: str) -> RemoteResult:
+    if returncode == SSH_ERROR_EXIT_CODE:
+        return RemoteResult(Outcome.DEAD, CONNECTION_DEAD_MESSAGE, returncode)
+    if returncode != 0:
+        return RemoteResult(Outcome.ERROR, f"⚠️ Error:\n{stdout}\n{stderr}", returncode)
+
+    output = stdout
+    if stderr:
+        output += f"\n{stderr}"
+
+    return RemoteResult(Outcome.OK, output if output.strip() else "No active jobs.", returncode)
+
+async def _terminate(proc: asyncio.subprocess.Process):
+    """Kill a still-running ssh client and reap it so no zombie is left behind."""
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+async def run_remote_command(
+    server: str,
+    cmd_string: str,
+    timeout: float = 15,
+    kind: Optional[str] = None
+) -> RemoteResult:
+    """
+    Run `cmd_string` on `server`. The result's outcome tells whether the server was
+    reached and the command succeeded; its text is the output, or the message to show
+    for a failure. Only costs a coroutine while the command runs; cancelling the
+    awaiting task kills the ssh client.
+    `kind` labels the command in metrics; by default it's guessed from the command,
+    so scripts built by the bot should name theirs.
+    """
+    started = time.perf_counter()
+    result = await _run_remote_command(server, cmd_string, timeout)
+    _observe(server, cmd_string, started, result.outcome, kind)
+    return result
+
+async def _run_remote_command(server: str, cmd_string: str, timeout: float) -> RemoteResult:
+    if _backend is not None:
+        return await _execute_on_backend(server, cmd_string, timeout)
+
+    if not connection_manager.precheck(server):
+        return _DEAD
+
+    cmd = _build_ssh_command(server, cmd_string)
+
     try:
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
-            timeout=15
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+    except Exception as e:
+        return _system_error(e)
+
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        await _terminate(proc)
+        return _TIMEOUT
+    except asyncio.CancelledError:
+        await _terminate(proc)
+        raise
+    except Exception as e:
+        await _terminate(proc)
+        return _system_error(e)
+
+    stderr_text = stderr.decode(errors="replace")
+    connection_manager.record_result(server, proc.returncode, stderr_text)
+    return _format_result(proc.returncode, stdout.decode(errors="replace"), stderr_text)
+
+remote_cache: ResultCache[RemoteResult] = ResultCache()
+
+async def run_cached_command(
+    server: str,
+    cmd_string: str,
+    ttl: float,
+    timeout: float = 15,
+    kind: Optional[str] = None
+) -> RemoteResult:
+    """
+    `run_remote_command` through the shared result cache.
+    Identical concurrent commands on a server share one ssh call, and successful
+    results are reused for `ttl` seconds. Only use it for read-only commands.
+    """
+    return await remote_cache.get_or_run(
+        (server, cmd_string),
+        lambda: run_remote_command(server, cmd_string, timeout=timeout, kind=kind),
+        ttl,
+        cacheable=lambda result: result.ok
+    )
 
-        if result.returncode != 0:
-            if "No such file" in result.stderr or result.returncode == 255:
-                return "❌ Connection Dead. Please re-authenticate on the Oracle Server."
-            return f"⚠️ Error:\n{result.stdout}\n{result.stderr}"
+async def stream_remote_command(
+    server: str,
+    cmd_string: str,
+    read_timeout: float = 15,
+    chunk_size: int = 4096
+) -> AsyncIterator[str]:
+    """
+    Run a remote command and yield its stdout incrementally as it arrives.
+    `read_timeout` bounds the wait for each chunk, not the whole command;
+    callers enforce their own overall deadline (e.g. with `asyncio.timeout`).
+    Errors are yielded as a final chunk with the same text as `run_remote_command`.
+    """
+    started = time.perf_counter()
+    outcome = Outcome.OK
+    try:
+        async for chunk in _stream_remote_command(server, cmd_string, read_timeout, chunk_size):
+            outcome = chunk.outcome
+            yield chunk.text
+    finally:
+        _observe(server, cmd_string, started, outcome)
+
+def _chunk(text: str) -> RemoteResult:
+    return RemoteResult(Outcome.OK, text)
 
-        output = result.stdout
-        if result.stderr:
-            output += f"\n{result.stderr}"
+async def _stream_remote_command(
+    server: str,
+    cmd_string: str,
+    read_timeout: float,
+    chunk_size: int
+) -> AsyncIterator[RemoteResult]:
+    if _backend is not None:
+        yield await _execute_on_backend(server, cmd_string, read_timeout)
+        return
 
-        return output if output.strip() else "No active jobs."
+    if not connection_manager.precheck(server):
+        yield _DEAD
+        return
 
-    except subprocess.TimeoutExpired:
-        return "❌ Command Timed Out."
+    cmd = _build_ssh_command(server, cmd_string)
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
     except Exception as e:
-        return f"❌ System Error: {str(e)}"
+        yield _system_error(e)
+        return
+
+    # Drain stderr concurrently so a chatty command can't block on a full pipe
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    # Chunks may split multi-byte characters
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(proc.stdout.read(chunk_size), timeout=read_timeout)
+            except asyncio.TimeoutError:
+                yield _TIMEOUT
+                return
+
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            if text:
+                yield _chunk(text)
+
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield _chunk(tail)
+
+        stderr = (await stderr_task).decode(errors="replace")
+        returncode = await proc.wait()
+        connection_manager.record_result(server, returncode, stderr)
+
+        if returncode != 0:
+            yield _format_result(returncode, "", stderr)
+        elif stderr:
+            yield _chunk(f"\n{stderr}")
+    finally:
+        # Also runs when the consumer stops iterating or is cancelled
+        stderr_task.cancel()
+        await _terminate(proc)
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from .config import settings
+from .slack_client import slack_client
+from .ssh_client import stream_remote_command
+
+MAX_OUTPUT_CHARS = 3000  # Tail of the output shown in a message
+
+def _render(server: str, output: str, footer: str, truncated: bool = False) -> dict:
+    if truncated:
+        output = "…" + output
+    text = f"💻 Output ({server}):\n```{output or ' '}```"
+    if footer:
+        text += f"\n{footer}"
+    return {"text": text}
+
+async def stream_to_response_url(server: str, cmd: str, response_url: str, max_updates: int = 0):
+    """
+    Run `cmd` on `server` and post its output to `response_url` progressively.
+
+    The first chunk is posted as soon as it arrives, later ones replace it at most
+    every STREAM_UPDATE_INTERVAL seconds. Slack accepts only a handful of posts per
+    response_url, so at most `max_updates` posts are made (STREAM_MAX_UPDATES by
+    default), the last one always being the final output. STREAM_READ_TIMEOUT bounds
+    the wait for each chunk, STREAM_DEADLINE the whole command.
+    """
+    max_updates = max_updates or settings.STREAM_MAX_UPDATES
+    output = ""  # Only the tail that is shown, so a huge log isn't held in memory
+    truncated = False
+    has_output = False
+    posts = 0
+    last_post = 0.0
+    footer = ""
+
+    try:
+        async with asyncio.timeout(settings.STREAM_DEADLINE):
+            async for chunk in stream_remote_command(server, cmd, read_timeout=settings.STREAM_READ_TIMEOUT):
+                output += chunk
+                if len(output) > MAX_OUTPUT_CHARS:
+                    output = output[-MAX_OUTPUT_CHARS:]
+                    truncated = True
+                has_output = has_output or bool(chunk.strip())
+
+                # Keep one post in reserve for the final output
+                now = time.monotonic()
+                if posts < max_updates - 1 and (posts == 0 or now - last_post >= settings.STREAM_UPDATE_INTERVAL):
+                    await slack_client.post_response(
+                        response_url,
+                        {**_render(server, output, "⏳ Still running...", truncated), "replace_original": posts > 0}
+                    )
+                    posts += 1
+                    last_post = now
+    except TimeoutError:
+        footer = f"⏱️ Stopped after {settings.STREAM_DEADLINE:g}s deadline."
+
+    if not has_output:
+        output, truncated = "No output.", False
+    await slack_client.post_response(response_url, {**_render(server, output, footer, truncated), "replace_original": posts > 0})
@@ -0,0 +1,196 @@
+import os
+import struct
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, unquote
+from .config import Lazy, settings
+from .metric_extractor import MetricRecord
+
+_POINT = struct.Struct("<ddd")  # Unix time, step, value
+_SUFFIX = ".ts"
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+class Series:
+    """One metric of one job as parallel columns; 24 bytes per point in memory and on disk."""
+    __slots__ = ("times", "steps", "values")
+
+    def __init__(self):
+        self.times = array("d")
+        self.steps = array("d")
+        self.values = array("d")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, at: float, step: float, value: float):
+        self.times.append(at)
+        self.steps.append(step)
+        self.values.append(value)
+
+    def extend_from_bytes(self, data: bytes):
+        for at, step, value in _POINT.iter_unpack(data):
+            self.append(at, step, value)
+
+    def to_bytes(self) -> bytes:
+        return b"".join(_POINT.pack(*point) for point in zip(self.times, self.steps, self.values))
+
+    def downsampled(self) -> "Series":
+        """
+        Halve the resolution of the older half of the series. The recent half is kept
+        as is, and so are the highest and lowest values, so the best result survives.
+        """
+        half = len(self) // 2
+        keep = set(range(0, half, 2)) | set(range(half, len(self)))
+        if self.values:
+            keep.add(max(range(len(self)), key=self.values.__getitem__))
+            keep.add(min(range(len(self)), key=self.values.__getitem__))
+
+        result = Series()
+        for i in sorted(keep):
+            result.append(self.times[i], self.steps[i], self.values[i])
+        return result
+
+class TrendSummary(NamedTuple):
+    points: int
+    first_step: float
+    last_step: float
+    best: float
+    best_step: float
+    last: float
+    slope: float  # Change per step over the recent points
+    seconds_per_step: float  # 0 when unknown
+
+def lower_is_better(metric: str) -> bool:
+    name = metric.lower()
+    return "loss" in name or "err" in name
+
+def summarize(metric: str, series: Series, window: int = 20) -> TrendSummary:
+    """Best and last value, and a least-squares slope over the last `window` points."""
+    values, steps = series.values, series.steps
+    pick = min if lower_is_better(metric) else max
+    best_index = pick(range(len(values)), key=values.__getitem__)
+
+    start = max(0, len(values) - window)
+    xs, ys, ts = steps[start:], values[start:], series.times[start:]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+    seconds_per_step = (ts[-1] - ts[0]) / (xs[-1] - xs[0]) if xs[-1] > xs[0] else 0.0
+
+    return TrendSummary(
+        points=len(values),
+        first_step=steps[0],
+        last_step=steps[-1],
+        best=values[best_index],
+        best_step=steps[best_index],
+        last=values[-1],
+        slope=slope,
+        seconds_per_step=seconds_per_step,
+    )
+
+def sparkline(values: Iterable[float], width: int = 40) -> str:
+    """Render `values` as block characters, averaging them into at most `width` buckets."""
+    values = list(values)
+    if len(values) > width:
+        buckets = [values[i * len(values) // width:(i + 1) * len(values) // width] for i in range(width)]
+        values = [sum(bucket) / len(bucket) for bucket in buckets]
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[round((v - low) * scale)] for v in values)
+
+def _file_name(part: str) -> str:
+    # Percent-encode everything, dots included, so no name can escape the directory
+    return quote(part, safe="").replace(".", "%2E")
+
+class TimeSeriesStore:
+    """
+    Metric history of monitored jobs, kept on local disk.
+
+    Each (server, job, metric) is an append-only file of fixed-size points, so
+    recording a result is one small append. A series longer than `max_points`
+    is rewritten downsampled, which bounds the size of long runs. Reads go
+    through an LRU of parsed series that only reads the bytes appended since
+    the last read, so any web worker can serve history the leader records.
+    """
+    def __init__(self, root: str, max_points: int = 4096, max_cached: int = 256):
+        self.root = root
+        self.max_points = max_points
+        self.max_cached = max_cached
+        # Path -> (inode, size read so far, series)
+        self._cache: "OrderedDict[str, Tuple[int, int, Series]]" = OrderedDict()
+
+    def _job_dir(self, server: str, job_id: str) -> str:
+        return os.path.join(self.root, _file_name(server), _file_name(job_id))
+
+    def append(self, server: str, job_id: str, records: List[MetricRecord], at: Optional[float] = None):
+        at = time.time() if at is None else at
+        by_metric: Dict[str, List[bytes]] = {}
+        for record in records:
+            by_metric.setdefault(record.name, []).append(_POINT.pack(at, record.step, record.value))
+
+        directory = self._job_dir(server, job_id)
+        os.makedirs(directory, exist_ok=True)
+        for metric, points in by_metric.items():
+            path = os.path.join(directory, _file_name(metric) + _SUFFIX)
+            with open(path, "ab") as f:
+                f.write(b"".join(points))
+                size = f.tell()
+            if size // _POINT.size > self.max_points:
+                self._compact(path)
+
+    def _compact(self, path: str):
+        series = self._read(path)
+        while len(series) > self.max_points:
+            series = series.downsampled()
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(series.to_bytes())
+        os.replace(tmp, path)
+
+    def load(self, server: str, job_id: str) -> Dict[str, Series]:
+        """Every recorded metric of a job, by name."""
+        directory = self._job_dir(server, job_id)
+        try:
+            names = sorted(name for name in os.listdir(directory) if name.endswith(_SUFFIX))
+        except FileNotFoundError:
+            return {}
+        result = {}
+        for name in names:
+            series = self._read(os.path.join(directory, name))
+            if series:
+                result[unquote(name[:-len(_SUFFIX)])] = series
+        return result
+
+    def _read(self, path: str) -> Series:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return Series()
+
+        inode, offset, series = self._cache.pop(path, (None, 0, None))
+        if series is None or inode != stat.st_ino or stat.st_size < offset:
+            # Not cached, or rewritten by a compaction
+            series, offset = Series(), 0
+        if stat.st_size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(stat.st_size - offset)
+            usable = len(data) - len(data) % _POINT.size
+            series.extend_from_bytes(data[:usable])
+            offset += usable
+
+        self._cache[path] = (stat.st_ino, offset, series)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return series
+
+metric_history: TimeSeriesStore = Lazy(lambda: TimeSeriesStore(
+    settings.METRIC_HISTORY_DIR,
+    max_points=settings.METRIC_HISTORY_MAX_POINTS
+))